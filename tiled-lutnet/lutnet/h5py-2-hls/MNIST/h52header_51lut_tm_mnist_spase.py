@@ -1,6 +1,11 @@
+import os
+import sys
 import h5py
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from codegen import pack_words, hex_words, c_list, lut_inits, minimise_luts, share_luts, lut_report, lut_verilog, Outputs
+
 def SignNumpy(x):
   return np.greater(x,0)
 
@@ -100,6 +105,14 @@ def makeConvBNComplex(fanin, beta, gamma, mean, invstd, interleaveChannels=False
 
 if __name__ == "__main__":
 
+    # luts=sop (default) writes every LUT of a LUTARRAY as a sum of products, luts=init as a LUT5 primitive with its
+    # INIT truth table and luts=rom as the INIT constant shifted by the LUT inputs; with these two, the LUTs are reduced
+    # to the inputs they depend on unless minimise=0, and LUTs identical across filters are built once unless dedupe=0
+    opts = dict(arg.split('=',1) for arg in sys.argv[1:])
+    lut_style = opts.get('luts', 'sop')
+    minimise = opts.get('minimise', '1') != '0'
+    dedupe = opts.get('dedupe', '1') != '0'
+
     print("Loading the pretrained parameters...")
 
     bl = h5py.File("pretrained_network_51lut_tm_mnist.h5", 'r')
@@ -164,39 +177,40 @@ if __name__ == "__main__":
     
     # dense layer 2
 
-    bl_c1  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_1:0"])
-    bl_c2  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_2:0"])
-    bl_c3  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_3:0"])
-    bl_c4  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_4:0"])
-    bl_c5  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_5:0"])
-    bl_c6  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_6:0"])
-    bl_c7  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_7:0"])
-    bl_c8  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_8:0"])   
-    bl_c9  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_9:0"])
-    bl_c10 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_10:0"])
-    bl_c11 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_11:0"])
-    bl_c12 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_12:0"])
-    bl_c13 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_13:0"])
-    bl_c14 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_14:0"])
-    bl_c15 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_15:0"])
-    bl_c16 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_16:0"])
-    bl_c17 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_17:0"])
-    bl_c18 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_18:0"])
-    bl_c19 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_19:0"])
-    bl_c20 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_20:0"])
-    bl_c21 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_21:0"])
-    bl_c22 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_22:0"])
-    bl_c23 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_23:0"])
-    bl_c24 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_24:0"])   
-    bl_c25 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_25:0"])
-    bl_c26 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_26:0"])
-    bl_c27 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_27:0"])
-    bl_c28 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_28:0"])
-    bl_c29 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_29:0"])
-    bl_c30 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_30:0"])
-    bl_c31 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_31:0"])
-    bl_c32 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_32:0"])
-    bl_w1  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_33:0"])
+    bl_c   = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["c:0"])
+    bl_c1  = bl_c[0]
+    bl_c2  = bl_c[1]
+    bl_c3  = bl_c[2]
+    bl_c4  = bl_c[3]
+    bl_c5  = bl_c[4]
+    bl_c6  = bl_c[5]
+    bl_c7  = bl_c[6]
+    bl_c8  = bl_c[7]
+    bl_c9  = bl_c[8]
+    bl_c10 = bl_c[9]
+    bl_c11 = bl_c[10]
+    bl_c12 = bl_c[11]
+    bl_c13 = bl_c[12]
+    bl_c14 = bl_c[13]
+    bl_c15 = bl_c[14]
+    bl_c16 = bl_c[15]
+    bl_c17 = bl_c[16]
+    bl_c18 = bl_c[17]
+    bl_c19 = bl_c[18]
+    bl_c20 = bl_c[19]
+    bl_c21 = bl_c[20]
+    bl_c22 = bl_c[21]
+    bl_c23 = bl_c[22]
+    bl_c24 = bl_c[23]
+    bl_c25 = bl_c[24]
+    bl_c26 = bl_c[25]
+    bl_c27 = bl_c[26]
+    bl_c28 = bl_c[27]
+    bl_c29 = bl_c[28]
+    bl_c30 = bl_c[29]
+    bl_c31 = bl_c[30]
+    bl_c32 = bl_c[31]
+    bl_w1  = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["Variable_1:0"])
     bl_rand_map_0 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["rand_map_0:0"])
     bl_rand_map_1 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["rand_map_1:0"])
     bl_rand_map_2 = np.array(bl["model_weights"]["binary_dense_2"]["binary_dense_2"]["rand_map_2:0"])
@@ -237,39 +251,40 @@ if __name__ == "__main__":
     # dense layer 3
 
 
-    bl_c1  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_1:0"])
-    bl_c2  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_2:0"])
-    bl_c3  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_3:0"])
-    bl_c4  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_4:0"])
-    bl_c5  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_5:0"])
-    bl_c6  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_6:0"])
-    bl_c7  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_7:0"])
-    bl_c8  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_8:0"])   
-    bl_c9  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_9:0"])
-    bl_c10 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_10:0"])
-    bl_c11 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_11:0"])
-    bl_c12 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_12:0"])
-    bl_c13 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_13:0"])
-    bl_c14 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_14:0"])
-    bl_c15 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_15:0"])
-    bl_c16 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_16:0"])
-    bl_c17 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_17:0"])
-    bl_c18 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_18:0"])
-    bl_c19 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_19:0"])
-    bl_c20 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_20:0"])
-    bl_c21 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_21:0"])
-    bl_c22 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_22:0"])
-    bl_c23 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_23:0"])
-    bl_c24 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_24:0"])   
-    bl_c25 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_25:0"])
-    bl_c26 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_26:0"])
-    bl_c27 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_27:0"])
-    bl_c28 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_28:0"])
-    bl_c29 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_29:0"])
-    bl_c30 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_30:0"])
-    bl_c31 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_31:0"])
-    bl_c32 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_32:0"])
-    bl_w1  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_33:0"])
+    bl_c   = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["c:0"])
+    bl_c1  = bl_c[0]
+    bl_c2  = bl_c[1]
+    bl_c3  = bl_c[2]
+    bl_c4  = bl_c[3]
+    bl_c5  = bl_c[4]
+    bl_c6  = bl_c[5]
+    bl_c7  = bl_c[6]
+    bl_c8  = bl_c[7]
+    bl_c9  = bl_c[8]
+    bl_c10 = bl_c[9]
+    bl_c11 = bl_c[10]
+    bl_c12 = bl_c[11]
+    bl_c13 = bl_c[12]
+    bl_c14 = bl_c[13]
+    bl_c15 = bl_c[14]
+    bl_c16 = bl_c[15]
+    bl_c17 = bl_c[16]
+    bl_c18 = bl_c[17]
+    bl_c19 = bl_c[18]
+    bl_c20 = bl_c[19]
+    bl_c21 = bl_c[20]
+    bl_c22 = bl_c[21]
+    bl_c23 = bl_c[22]
+    bl_c24 = bl_c[23]
+    bl_c25 = bl_c[24]
+    bl_c26 = bl_c[25]
+    bl_c27 = bl_c[26]
+    bl_c28 = bl_c[27]
+    bl_c29 = bl_c[28]
+    bl_c30 = bl_c[29]
+    bl_c31 = bl_c[30]
+    bl_c32 = bl_c[31]
+    bl_w1  = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["Variable_1:0"])
     bl_rand_map_0 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["rand_map_0:0"])
     bl_rand_map_1 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["rand_map_1:0"])
     bl_rand_map_2 = np.array(bl["model_weights"]["binary_dense_3"]["binary_dense_3"]["rand_map_2:0"])
@@ -310,39 +325,40 @@ if __name__ == "__main__":
     
     # dense layer 4
 
-    bl_c1  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_1:0"])
-    bl_c2  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_2:0"])
-    bl_c3  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_3:0"])
-    bl_c4  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_4:0"])
-    bl_c5  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_5:0"])
-    bl_c6  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_6:0"])
-    bl_c7  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_7:0"])
-    bl_c8  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_8:0"])   
-    bl_c9  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_9:0"])
-    bl_c10 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_10:0"])
-    bl_c11 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_11:0"])
-    bl_c12 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_12:0"])
-    bl_c13 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_13:0"])
-    bl_c14 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_14:0"])
-    bl_c15 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_15:0"])
-    bl_c16 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_16:0"])
-    bl_c17 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_17:0"])
-    bl_c18 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_18:0"])
-    bl_c19 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_19:0"])
-    bl_c20 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_20:0"])
-    bl_c21 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_21:0"])
-    bl_c22 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_22:0"])
-    bl_c23 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_23:0"])
-    bl_c24 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_24:0"])   
-    bl_c25 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_25:0"])
-    bl_c26 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_26:0"])
-    bl_c27 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_27:0"])
-    bl_c28 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_28:0"])
-    bl_c29 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_29:0"])
-    bl_c30 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_30:0"])
-    bl_c31 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_31:0"])
-    bl_c32 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_32:0"])
-    bl_w1  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_33:0"])
+    bl_c   = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["c:0"])
+    bl_c1  = bl_c[0]
+    bl_c2  = bl_c[1]
+    bl_c3  = bl_c[2]
+    bl_c4  = bl_c[3]
+    bl_c5  = bl_c[4]
+    bl_c6  = bl_c[5]
+    bl_c7  = bl_c[6]
+    bl_c8  = bl_c[7]
+    bl_c9  = bl_c[8]
+    bl_c10 = bl_c[9]
+    bl_c11 = bl_c[10]
+    bl_c12 = bl_c[11]
+    bl_c13 = bl_c[12]
+    bl_c14 = bl_c[13]
+    bl_c15 = bl_c[14]
+    bl_c16 = bl_c[15]
+    bl_c17 = bl_c[16]
+    bl_c18 = bl_c[17]
+    bl_c19 = bl_c[18]
+    bl_c20 = bl_c[19]
+    bl_c21 = bl_c[20]
+    bl_c22 = bl_c[21]
+    bl_c23 = bl_c[22]
+    bl_c24 = bl_c[23]
+    bl_c25 = bl_c[24]
+    bl_c26 = bl_c[25]
+    bl_c27 = bl_c[26]
+    bl_c28 = bl_c[27]
+    bl_c29 = bl_c[28]
+    bl_c30 = bl_c[29]
+    bl_c31 = bl_c[30]
+    bl_c32 = bl_c[31]
+    bl_w1  = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["Variable_1:0"])
     bl_rand_map_0 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["rand_map_0:0"])
     bl_rand_map_1 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["rand_map_1:0"])
     bl_rand_map_2 = np.array(bl["model_weights"]["binary_dense_4"]["binary_dense_4"]["rand_map_2:0"])
@@ -383,39 +399,40 @@ if __name__ == "__main__":
      
     # dense layer 5
 
-    bl_c1  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_1:0"])
-    bl_c2  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_2:0"])
-    bl_c3  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_3:0"])
-    bl_c4  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_4:0"])
-    bl_c5  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_5:0"])
-    bl_c6  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_6:0"])
-    bl_c7  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_7:0"])
-    bl_c8  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_8:0"])   
-    bl_c9  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_9:0"])
-    bl_c10 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_10:0"])
-    bl_c11 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_11:0"])
-    bl_c12 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_12:0"])
-    bl_c13 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_13:0"])
-    bl_c14 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_14:0"])
-    bl_c15 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_15:0"])
-    bl_c16 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_16:0"])
-    bl_c17 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_17:0"])
-    bl_c18 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_18:0"])
-    bl_c19 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_19:0"])
-    bl_c20 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_20:0"])
-    bl_c21 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_21:0"])
-    bl_c22 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_22:0"])
-    bl_c23 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_23:0"])
-    bl_c24 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_24:0"])   
-    bl_c25 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_25:0"])
-    bl_c26 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_26:0"])
-    bl_c27 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_27:0"])
-    bl_c28 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_28:0"])
-    bl_c29 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_29:0"])
-    bl_c30 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_30:0"])
-    bl_c31 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_31:0"])
-    bl_c32 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_32:0"])
-    bl_w1  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_33:0"])
+    bl_c   = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["c:0"])
+    bl_c1  = bl_c[0]
+    bl_c2  = bl_c[1]
+    bl_c3  = bl_c[2]
+    bl_c4  = bl_c[3]
+    bl_c5  = bl_c[4]
+    bl_c6  = bl_c[5]
+    bl_c7  = bl_c[6]
+    bl_c8  = bl_c[7]
+    bl_c9  = bl_c[8]
+    bl_c10 = bl_c[9]
+    bl_c11 = bl_c[10]
+    bl_c12 = bl_c[11]
+    bl_c13 = bl_c[12]
+    bl_c14 = bl_c[13]
+    bl_c15 = bl_c[14]
+    bl_c16 = bl_c[15]
+    bl_c17 = bl_c[16]
+    bl_c18 = bl_c[17]
+    bl_c19 = bl_c[18]
+    bl_c20 = bl_c[19]
+    bl_c21 = bl_c[20]
+    bl_c22 = bl_c[21]
+    bl_c23 = bl_c[22]
+    bl_c24 = bl_c[23]
+    bl_c25 = bl_c[24]
+    bl_c26 = bl_c[25]
+    bl_c27 = bl_c[26]
+    bl_c28 = bl_c[27]
+    bl_c29 = bl_c[28]
+    bl_c30 = bl_c[29]
+    bl_c31 = bl_c[30]
+    bl_c32 = bl_c[31]
+    bl_w1  = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["Variable_1:0"])
     bl_rand_map_0 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["rand_map_0:0"])
     bl_rand_map_1 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["rand_map_1:0"])
     bl_rand_map_2 = np.array(bl["model_weights"]["binary_dense_5"]["binary_dense_5"]["rand_map_2:0"])
@@ -463,9 +480,10 @@ if __name__ == "__main__":
             weights_w[i][j] = SignNumpy(weights_w[i][j])
 
     # write header file
-    with open('../codegen_output/weights.h', 'w') as f:
+    outputs = Outputs()
+    with outputs.open('../codegen_output/weights.h', 'w') as f:
         f.write('#pragma once\n')
-    with open('../codegen_output/weights.h', 'a') as f:
+    with outputs.open('../codegen_output/weights.h', 'a') as f:
         f.write('//Generated weights for MNIST\n')
 
     for layer_id in range(5):
@@ -549,39 +567,11 @@ if __name__ == "__main__":
             else:
                 print("unknown weight format!")
 
-            with open('../codegen_output/weights.h', 'a') as f:
+            with outputs.open('../codegen_output/weights.h', 'a') as f:
                 fold = (word_length_c-1)/32 + 1
                 f.write('//Array shape: {}\n'.format([nfilters_c,ninch_w/ninch_c,nfilters_w/nfilters_c,fold]))
                 f.write("static ap_uint<32> " + "weights_w_" + layer_type + str(layer_id+1) + "_" + str(weight_id+1) + "["+str(nfilters_c) + "]["+str(ninch_w/ninch_c) + "]["+str(nfilters_w/nfilters_c) + "]["+str(fold) + "] = {")
-                for t1 in range(nfilters_c):
-                    if t1!=0:
-                        f.write(",")
-                    f.write("{")
-                    for t2 in range(ninch_w/ninch_c):
-                        if t2!=0:
-                            f.write(",")
-                        f.write("{")
-                        for t3 in range(nfilters_w/nfilters_c):
-                            if t3!=0:
-                                f.write(",")
-                            f.write("{")
-                            bin_append = 0
-                            for i, ele in enumerate(mat[t1][t2][t3]):
-                                #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                                bin_append = bin_append | (int(ele) << (i % word_length_c)) # right-first bit-push
-                                if (i == word_length_c-1):
-                                    mask = 0xFFFFFFFF
-                                    for i_32b in range(fold):
-                                        #word = (bin_append>>(32*(fold-i_32b-1))) & mask # Big-endian: left-first word-push
-                                        word = (bin_append>>(32*i_32b)) & mask # Little-endian: right-first word-push
-                                        hex_word = '%X' % word
-                                        if i_32b!=0:
-                                            f.write(', ')
-                                        f.write('0x' + hex_word)
-                                    bin_append = 0
-                            f.write("}")
-                        f.write("}")
-                    f.write("}")
+                f.write(c_list(pack_words(mat)))
 
 
                 f.write('};\n')
@@ -597,26 +587,11 @@ if __name__ == "__main__":
                 else:
                     print("unknown weight format!")
 
-                with open('../codegen_output/weights.h', 'a') as f:
+                with outputs.open('../codegen_output/weights.h', 'a') as f:
                     f.write('//Array shape: {}\n'.format(dims_c))
                     fold = (word_length_c-1)/32 + 1
                     f.write("const ap_uint<32> " + "weights_c_" + layer_type + str(layer_id+1) + "_" + str(weight_id+1) + "["+str(nfilters_c*fold) + "] = {")
-                    bin_append = 0
-                    for i, ele in enumerate(mat_flat):
-                        #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                        bin_append = bin_append | (int(ele) << (i % word_length_c)) # right-first bit-push
-                        if (i % word_length_c == (word_length_c - 1)):
-                            mask = 0xFFFFFFFF
-                            for i_32b in range(fold):
-                                #word = (bin_append>>(32*(fold-i_32b-1))) & mask # Big-endian: left-first word-push
-                                word = (bin_append>>(32*i_32b)) & mask # Little-endian: right-first word-push
-                                hex_word = '%X' % word
-                                if i_32b!=0:
-                                    f.write(', ')
-                                f.write('0x' + hex_word)
-                            bin_append = 0
-                            if i != nfilters_c*word_length_c-1:
-                                f.write(', ')
+                    f.write(hex_words(pack_words(np.reshape(mat_flat, (-1,word_length_c)))))
                     f.write('};\n')
 
         if layer_id != 0:
@@ -646,8 +621,16 @@ if __name__ == "__main__":
                     else:
                         print("unknown weight format!")
                     mat_flat.extend([mat])
+                used, inits = minimise_luts(mat_flat)
+                if not minimise:
+                    used, inits = np.ones(np.shape(used), bool), lut_inits(mat_flat)
+                source = share_luts(used, inits, pm_flat, [True, True, True, True, False]) # the weight input differs per filter
+                if not dedupe:
+                    source = np.arange(nfilters_c).reshape(-1,1) * np.ones(np.shape(pm_flat), int)
+                if lut_style != 'sop':
+                    print(lut_report(modname, used, inits, pm_flat, source))
     
-                with open('../codegen_output/'+modname+'.v', 'w') as v0:
+                with outputs.open('../codegen_output/'+modname+'.v', 'w') as v0:
                     v0.write('`timescale 1 ns / 1 ps\n\n')
                     v0.write('module '+modname+' (\n        in_V,\n        in_1_V,\n        in_2_V,\n        in_3_V')
                     for tm in range(nfilters_c):
@@ -656,7 +639,7 @@ if __name__ == "__main__":
                         v0.write(',\n        ap_return_' + str(tm))
                     v0.write(');\n\n')
     
-                with open('../codegen_output/'+modname+'.v', 'a') as v0:
+                with outputs.open('../codegen_output/'+modname+'.v', 'a') as v0:
                     v0.write('\n\n')
                     v0.write('input  [' + str(word_length_c-1) + ':0] in_V;\n')
                     v0.write('input  [' + str(word_length_c-1) + ':0] in_1_V;\n')
@@ -670,6 +653,13 @@ if __name__ == "__main__":
                         for ti, ele in enumerate(pm_flat[tm]):
                             if ele==1:
                                 v0.write('wire tmp_' + str(tm) + '_' + str(ti) + ';\n')
+                                if lut_style != 'sop' and source[tm][ti] != tm:
+                                    v0.write('assign tmp_' + str(tm) + '_' + str(ti) + ' = tmp_' + str(source[tm][ti]) + '_' + str(ti) + ';\n')
+                                    continue
+                                if lut_style != 'sop':
+                                    lut_inputs = [x + '[' + str(ti) + ']' for x, u in zip(['in_V', 'in_1_V', 'in_2_V', 'in_3_V', 'weight_0_' + str(tm) + '_V_read'], used[tm][ti]) if u]
+                                    v0.write(lut_verilog(lut_style, 'lut_' + str(tm) + '_' + str(ti), 'tmp_' + str(tm) + '_' + str(ti), lut_inputs, inits[tm][ti]))
+                                    continue
                                 v0.write('assign tmp_' + str(tm) + '_' + str(ti) + ' = ')
                                 v0.write('(' + str(int(mat_flat[0][tm][ti]))  + ' &  in_V[' + str(ti) + '] &  in_1_V[' + str(ti) + '] &  in_2_V[' + str(ti) + '] &  in_3_V[' + str(ti) + '] &  weight_0_' + str(tm) + '_V_read[' + str(ti) + ']) | ')
                                 v0.write('(' + str(int(mat_flat[1][tm][ti]))  + ' &  in_V[' + str(ti) + '] &  in_1_V[' + str(ti) + '] &  in_2_V[' + str(ti) + '] &  in_3_V[' + str(ti) + '] & ~weight_0_' + str(tm) + '_V_read[' + str(ti) + ']) | ')
@@ -734,15 +724,23 @@ if __name__ == "__main__":
                     else:
                         print("unknown weight format!")
                     mat_flat.extend([mat])
+                used, inits = minimise_luts(mat_flat)
+                if not minimise:
+                    used, inits = np.ones(np.shape(used), bool), lut_inits(mat_flat)
+                source = share_luts(used, inits, pm_flat, [True, True, True, True, False]) # the weight input differs per filter
+                if not dedupe:
+                    source = np.arange(nfilters_c).reshape(-1,1) * np.ones(np.shape(pm_flat), int)
+                if lut_style != 'sop':
+                    print(lut_report(modname, used, inits, pm_flat, source))
     
-                with open('../codegen_output/'+modname+'.v', 'w') as v0:
+                with outputs.open('../codegen_output/'+modname+'.v', 'w') as v0:
                     v0.write('`timescale 1 ns / 1 ps\n\n')
                     v0.write('module '+modname+' (\n        in_V,\n        in_1_V,\n        in_2_V,\n        in_3_V')
                     for tm in range(nfilters_c):
                         v0.write(',\n        weight_' + str(tm) + '_V_read')
                     v0.write(',\n        ap_return);\n\n')
     
-                with open('../codegen_output/'+modname+'.v', 'a') as v0:
+                with outputs.open('../codegen_output/'+modname+'.v', 'a') as v0:
                     v0.write('\n\n')
                     v0.write('input  [' + str(word_length_c-1) + ':0] in_V;\n')
                     v0.write('input  [' + str(word_length_c-1) + ':0] in_1_V;\n')
@@ -756,6 +754,13 @@ if __name__ == "__main__":
                         for ti, ele in enumerate(pm_flat[tm]):
                             if ele==1:
                                 v0.write('wire tmp_' + str(tm) + '_' + str(ti) + ';\n')
+                                if lut_style != 'sop' and source[tm][ti] != tm:
+                                    v0.write('assign tmp_' + str(tm) + '_' + str(ti) + ' = tmp_' + str(source[tm][ti]) + '_' + str(ti) + ';\n')
+                                    continue
+                                if lut_style != 'sop':
+                                    lut_inputs = [x + '[' + str(ti) + ']' for x, u in zip(['in_V', 'in_1_V', 'in_2_V', 'in_3_V', 'weight_' + str(tm) + '_V_read'], used[tm][ti]) if u]
+                                    v0.write(lut_verilog(lut_style, 'lut_' + str(tm) + '_' + str(ti), 'tmp_' + str(tm) + '_' + str(ti), lut_inputs, inits[tm][ti]))
+                                    continue
                                 v0.write('assign tmp_' + str(tm) + '_' + str(ti) + ' = ')
                                 v0.write('(' + str(int(mat_flat[0][tm][ti]))  + ' &  in_V[' + str(ti) + '] &  in_1_V[' + str(ti) + '] &  in_2_V[' + str(ti) + '] &  in_3_V[' + str(ti) + '] &  weight_' + str(tm) + '_V_read[' + str(ti) + ']) | ')
                                 v0.write('(' + str(int(mat_flat[1][tm][ti]))  + ' &  in_V[' + str(ti) + '] &  in_1_V[' + str(ti) + '] &  in_2_V[' + str(ti) + '] &  in_3_V[' + str(ti) + '] & ~weight_' + str(tm) + '_V_read[' + str(ti) + ']) | ')
@@ -827,7 +832,7 @@ if __name__ == "__main__":
             thresholds = np.array(makeBNComplex(0, fanin, bn_betas[layer_id], bn_gammas[layer_id], bn_means[layer_id], bn_inv_stds[layer_id], usePopCount=use_popcount))
             next_means_bn_b0 = np.array(makeBNComplex(next_means_b0, fanin, bn_betas[layer_id], bn_gammas[layer_id], bn_means[layer_id], bn_inv_stds[layer_id], usePopCount=use_popcount)) - thresholds
 
-            with open('../codegen_output/weights.h', 'a') as f:
+            with outputs.open('../codegen_output/weights.h', 'a') as f:
                 f.write("const ap_fixed<24, 16> " + "thresh_" + layer_type + str(layer_id+1) + "["+str(len(thresholds))+"] = {")
                 for i, ele in enumerate(thresholds):
                     if i == 0:
@@ -854,36 +859,18 @@ if __name__ == "__main__":
 
         # generate pruning mask
         if layer_id!=0:
-            with open('../codegen_output/weights.h', 'a') as f:
+            with outputs.open('../codegen_output/weights.h', 'a') as f:
 
                 fold = (word_length_c-1)/32 + 1
                 #f.write('//Array shape: {}\n'.format([nfilters_c,ninch_w/ninch_c,nfilters_w/nfilters_c,fold]))
                 f.write("static ap_uint<32> " + "pruning_mask_" + layer_type + str(layer_id+1) + "_1["+str(nfilters_c) + "]["+str(fold) + "] = {")
-                for t1 in range(nfilters_c):
-                    if t1!=0:
-                        f.write(",")
-                    f.write("{")
-                    bin_append = 0
-                    for i, ele in enumerate(pruning_mask[t1]):
-                        #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                        bin_append = bin_append | (int(ele) << (i % word_length_c)) # right-first bit-push
-                        if (i == word_length_c-1):
-                            mask = 0xFFFFFFFF
-                            for i_32b in range(fold):
-                                #word = (bin_append>>(32*(fold-i_32b-1))) & mask # Big-endian: left-first word-push
-                                word = (bin_append>>(32*i_32b)) & mask # Little-endian: right-first word-push
-                                hex_word = '%X' % word
-                                if i_32b!=0:
-                                    f.write(', ')
-                                f.write('0x' + hex_word)
-                            bin_append = 0
-                    f.write("}")
+                f.write(c_list(pack_words(pruning_mask)))
 
 
                 f.write('};\n')
 
         # generate random map
-        with open('../codegen_output/weights.h', 'a') as f:
+        with outputs.open('../codegen_output/weights.h', 'a') as f:
             for rand_map_id in range(extra_activations):
                 rand_map = rand_maps[layer_id][rand_map_id].flatten().astype(np.uint32)
                 f.write("const unsigned int " + "rand_map_" + layer_type + str(layer_id+1) + "_" + str(rand_map_id+1) + "["+str(len(rand_map))+"] = {")
@@ -894,7 +881,7 @@ if __name__ == "__main__":
                         f.write(','+ str(ele))
                 f.write('};\n')
         # generate alpha
-        with open('../codegen_output/weights.h', 'a') as f:
+        with outputs.open('../codegen_output/weights.h', 'a') as f:
             if layer_id!=0:
                 alpha_b0 = abs(gammas[layer_id] * means[layer_id-1][0])
                 alpha_b1 = abs(gammas[layer_id] * means[layer_id-1][1])
@@ -908,6 +895,7 @@ if __name__ == "__main__":
                 f.write("const ap_fixed<24, 16> " + "alpha_" + layer_type + str(layer_id+1) + "[1] = {")
                 f.write(str(alpha_b0))
                 f.write('};\n')
+    outputs.commit()
 
 
 
@@ -1,6 +1,11 @@
+import os
+import sys
 import h5py
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from codegen import pack_words, c_list, Outputs
+
 def SignNumpy(x):
   return np.greater(x,0)
 
@@ -310,9 +315,10 @@ if __name__ == "__main__":
             weights_w[i][j] = SignNumpy(weights_w[i][j])
 
     # write header file
-    with open('../codegen_output/weights.h', 'w') as f:
+    outputs = Outputs()
+    with outputs.open('../codegen_output/weights.h', 'w') as f:
         f.write('#pragma once\n')
-    with open('../codegen_output/weights.h', 'a') as f:
+    with outputs.open('../codegen_output/weights.h', 'a') as f:
         f.write('//Generated weights for MNIST\n')
 
     for layer_id in range(5):
@@ -388,39 +394,11 @@ if __name__ == "__main__":
             else:
                 print("unknown weight format!")
 
-            with open('../codegen_output/weights.h', 'a') as f:
+            with outputs.open('../codegen_output/weights.h', 'a') as f:
                 fold = (word_length_c-1)/32 + 1
                 f.write('//Array shape: {}\n'.format([nfilters_c,ninch_w/ninch_c,nfilters_w/nfilters_c,fold]))
                 f.write("static ap_uint<32> " + "weights_w_" + layer_type + str(layer_id+1) + "_" + str(weight_id+1) + "["+str(nfilters_c) + "]["+str(ninch_w/ninch_c) + "]["+str(nfilters_w/nfilters_c) + "]["+str(fold) + "] = {")
-                for t1 in range(nfilters_c):
-                    if t1!=0:
-                        f.write(",")
-                    f.write("{")
-                    for t2 in range(ninch_w/ninch_c):
-                        if t2!=0:
-                            f.write(",")
-                        f.write("{")
-                        for t3 in range(nfilters_w/nfilters_c):
-                            if t3!=0:
-                                f.write(",")
-                            f.write("{")
-                            bin_append = 0
-                            for i, ele in enumerate(mat[t1][t2][t3]):
-                                #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                                bin_append = bin_append | (int(ele) << (i % word_length_c)) # right-first bit-push
-                                if (i == word_length_c-1):
-                                    mask = 0xFFFFFFFF
-                                    for i_32b in range(fold):
-                                        #word = (bin_append>>(32*(fold-i_32b-1))) & mask # Big-endian: left-first word-push
-                                        word = (bin_append>>(32*i_32b)) & mask # Little-endian: right-first word-push
-                                        hex_word = '%X' % word
-                                        if i_32b!=0:
-                                            f.write(', ')
-                                        f.write('0x' + hex_word)
-                                    bin_append = 0
-                            f.write("}")
-                        f.write("}")
-                    f.write("}")
+                f.write(c_list(pack_words(mat)))
 
 
                 f.write('};\n')
@@ -448,7 +426,7 @@ if __name__ == "__main__":
             thresholds = np.array(makeBNComplex(0, fanin, bn_betas[layer_id], bn_gammas[layer_id], bn_means[layer_id], bn_inv_stds[layer_id], usePopCount=use_popcount))
             next_means_bn_b0 = np.array(makeBNComplex(next_means_b0, fanin, bn_betas[layer_id], bn_gammas[layer_id], bn_means[layer_id], bn_inv_stds[layer_id], usePopCount=use_popcount)) - thresholds
 
-            with open('../codegen_output/weights.h', 'a') as f:
+            with outputs.open('../codegen_output/weights.h', 'a') as f:
                 f.write("const ap_fixed<24, 16> " + "thresh_" + layer_type + str(layer_id+1) + "["+str(len(thresholds))+"] = {")
                 for i, ele in enumerate(thresholds):
                     if i == 0:
@@ -465,37 +443,19 @@ if __name__ == "__main__":
                 f.write('};\n')
         # generate pruning mask
         if layer_id!=0:
-            with open('../codegen_output/weights.h', 'a') as f:
+            with outputs.open('../codegen_output/weights.h', 'a') as f:
 
                 fold = (word_length_c-1)/32 + 1
                 #f.write('//Array shape: {}\n'.format([nfilters_c,ninch_w/ninch_c,nfilters_w/nfilters_c,fold]))
                 f.write("static ap_uint<32> " + "pruning_mask_" + layer_type + str(layer_id+1) + "_" + str(weight_id+1) + "["+str(nfilters_c) + "]["+str(fold) + "] = {")
-                for t1 in range(nfilters_c):
-                    if t1!=0:
-                        f.write(",")
-                    f.write("{")
-                    bin_append = 0
-                    for i, ele in enumerate(pruning_mask[t1]):
-                        #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                        bin_append = bin_append | (int(ele) << (i % word_length_c)) # right-first bit-push
-                        if (i == word_length_c-1):
-                            mask = 0xFFFFFFFF
-                            for i_32b in range(fold):
-                                #word = (bin_append>>(32*(fold-i_32b-1))) & mask # Big-endian: left-first word-push
-                                word = (bin_append>>(32*i_32b)) & mask # Little-endian: right-first word-push
-                                hex_word = '%X' % word
-                                if i_32b!=0:
-                                    f.write(', ')
-                                f.write('0x' + hex_word)
-                            bin_append = 0
-                    f.write("}")
+                f.write(c_list(pack_words(pruning_mask)))
 
 
                 f.write('};\n')
 
 
         # generate random map
-        with open('../codegen_output/weights.h', 'a') as f:
+        with outputs.open('../codegen_output/weights.h', 'a') as f:
             rand_map = rand_maps[layer_id].flatten().astype(np.uint32)
             f.write("const unsigned int " + "rand_map_" + layer_type + str(layer_id+1) + "["+str(len(rand_map))+"] = {")
             for i, ele in enumerate(rand_map):
@@ -505,7 +465,7 @@ if __name__ == "__main__":
                     f.write(','+ str(ele))
             f.write('};\n')
         # generate alpha
-        with open('../codegen_output/weights.h', 'a') as f:
+        with outputs.open('../codegen_output/weights.h', 'a') as f:
             if layer_id!=0:
                 alpha_b0 = abs(gammas[layer_id] * means[layer_id-1][0])
                 alpha_b1 = abs(gammas[layer_id] * means[layer_id-1][1])
@@ -519,6 +479,7 @@ if __name__ == "__main__":
                 f.write("const ap_fixed<24, 16> " + "alpha_" + layer_type + str(layer_id+1) + "[1] = {")
                 f.write(str(alpha_b0))
                 f.write('};\n')
+    outputs.commit()
 
 
 
@@ -0,0 +1,185 @@
+'''Shared helpers of the h52header_* code generators.
+
+Binary parameters are packed a whole array at a time: every row of bits becomes ceil(len/32) ap_uint<32> words,
+bit i of the row at bit i%32 of word i//32 (right-first bit-push, little-endian word order), and the words are formatted
+into C initialisers in bulk.
+
+The generated files are collected in an Outputs buffer and only written, all at once, when generation completes: each
+file goes to a temporary file next to it that is then renamed over it, so an interrupted run leaves the previous
+weights.h and LUTARRAY*.v in place rather than a half-written file for HLS or Vivado to pick up.
+
+The LUTs of a LUTARRAY can be written as their sum-of-products expressions or, from lut_inits, as one 2^K-bit INIT
+constant per LUT: a LUT1..LUT6 primitive instance ('init') or a shift of the constant by the inputs ('rom').
+minimise_luts first reduces every truth table to the inputs it depends on, so that constant LUTs become constants,
+LUTs that pass one input through become wires and the others use as few LUT inputs as they need. share_luts then
+finds the LUTs of different filters that compute the same function of the same wires, so that only one is built.
+'''
+import os
+from collections import OrderedDict
+import numpy as np
+
+def pack_words(bits):
+	'''[...,fold] uint64 array of the 32-bit words of the rows of the 0/1 array bits [...,L], fold=(L-1)/32+1.'''
+	bits=np.asarray(bits)
+	L=bits.shape[-1]
+	fold=(L-1)//32+1
+	padded=np.zeros(bits.shape[:-1]+(fold*32,),np.uint64)
+	padded[...,:L]=bits.astype(np.int64)
+	return padded.reshape(bits.shape[:-1]+(fold,32)).dot(np.left_shift(np.uint64(1),np.arange(32,dtype=np.uint64)))
+
+def hex_words(words):
+	'''The words of an array as a ', '-separated list of C hex literals, in C order.'''
+	return ', '.join(np.char.mod('0x%X',np.ravel(words)))
+
+def c_list(words):
+	'''Contents of the C brace initialiser of a [...,fold] word array, without its outermost braces.
+	Nested levels are separated by ',' and the words of the innermost level by ', '.
+	'''
+	words=np.asarray(words)
+	if words.ndim<=1:
+		return hex_words(words)
+	return ','.join(['{'+c_list(w)+'}' for w in words])
+
+def hex_rows(bits):
+	'''Every row of the 0/1 array bits [...,L] as one hex number (bit i of the row at bit i), without leading zeros.'''
+	words=pack_words(bits)
+	words=words.reshape(-1,words.shape[-1])[:,::-1] # most significant word first
+	rows=[]
+	for row in words:
+		nz=np.flatnonzero(row)
+		if len(nz)==0:
+			rows.append('0')
+		else:
+			rows.append('%X'%row[nz[0]]+''.join(np.char.mod('%08X',row[nz[0]+1:])))
+	return rows
+
+def lut_inits(tables):
+	'''2^K-bit INIT constants, as hex digit strings of shape tables.shape[1:], of the binarized truth tables [2^K,...].
+	Row k of a table is the sum-of-products term with input i (MSB first) complemented when bit i of k is set, so the
+	INIT bit of input value j is row 2^K-1-j.
+	'''
+	tables=np.asarray(tables)
+	K=int(np.log2(len(tables)))
+	words=pack_words(np.moveaxis(tables[::-1],0,-1))
+	if words.shape[-1]==1:
+		return np.char.mod('%0'+str(max(1,2**K//4))+'X',words[...,0])
+	inits=np.char.mod('%08X',words[...,-1])
+	for i in range(words.shape[-1]-2,-1,-1):
+		inits=np.char.add(inits,np.char.mod('%08X',words[...,i]))
+	return inits
+
+def minimise_luts(tables):
+	'''(used,inits) of the binarized truth tables [2^K,...]: used[...,i] is False where a LUT does not depend on its
+	input i (MSB first) and inits are the lut_inits constants of the LUTs over their used inputs only. A constant LUT
+	has no used inputs and an init of '0' or '1'.
+	'''
+	tables=np.asarray(tables).astype(bool)
+	K=int(np.log2(len(tables)))
+	shape=tables.shape[1:]
+	t=tables.reshape((2,)*K+(-1,)) # axis i is input i, set where the input is complemented
+	used=np.stack([np.any(np.take(t,0,axis=i)!=np.take(t,1,axis=i),axis=tuple(range(K-1))) for i in range(K)],axis=-1)
+	inits=np.empty(len(used),object)
+	patterns,inverse=np.unique(used,axis=0,return_inverse=True)
+	inverse=inverse.reshape(-1)
+	for p,pattern in enumerate(patterns):
+		sel=inverse==p
+		sub=t[...,sel]
+		for i in reversed(range(K)):
+			if not pattern[i]:
+				sub=np.take(sub,0,axis=i)
+		inits[sel]=lut_inits(sub.reshape(-1,np.sum(sel)))
+	return used.reshape(shape+(K,)),inits.reshape(shape)
+
+def share_luts(used,inits,mask,shared):
+	'''Filter whose LUT each unpruned LUT (mask) of the minimise_luts results [filters,...] can reuse, of shape mask.shape.
+	shared[i] tells whether LUT input i is the same wire in all filters (the activations, but not the BRAM weights of a
+	filter). LUTs at the same position of different filters are identical if they have the same truth table over the same
+	used inputs, all of them shared; each then reuses the LUT of the first such filter. Constants and wires, which cost no
+	LUT, and all other LUTs keep their own filter.
+	'''
+	mask=np.asarray(mask).astype(bool)
+	inputs=np.sum(used,axis=-1)
+	lut=mask&(inputs>0)&~((inputs==1)&(inits=='2'))
+	candidate=lut&~np.any(used&~np.asarray(shared,bool),axis=-1)
+	filters=np.arange(mask.shape[0]).reshape((-1,)+(1,)*(mask.ndim-1))*np.ones(mask.shape,int)
+	position=np.arange(mask[0].size).reshape(mask.shape[1:])*np.ones(mask.shape,int)
+	pattern=np.dot(used,1<<np.arange(used.shape[-1]))
+	keys=np.char.add(np.char.add(np.char.mod('%d_',position),np.char.mod('%d_',pattern)),inits.astype(str))[candidate]
+	_,first,inverse=np.unique(keys,return_index=True,return_inverse=True)
+	source=filters.copy()
+	source[candidate]=filters[candidate][first[inverse.reshape(-1)]]
+	return source
+
+def lut_report(name,used,inits,mask,source=None):
+	'''One line summary of the minimise_luts (and share_luts) results of the unpruned LUTs (mask) of a layer.'''
+	mask=np.asarray(mask).astype(bool)
+	inputs=np.sum(used,axis=-1)[mask]
+	wire=(inputs==1)&(inits[mask]=='2')
+	duplicate=np.zeros(len(inputs),bool)
+	if source is not None:
+		duplicate=(source!=np.arange(mask.shape[0]).reshape((-1,)+(1,)*(mask.ndim-1)))[mask]
+	constants,wires,shared=np.sum(inputs==0),np.sum(wire),np.sum(duplicate)
+	sizes=np.bincount(inputs[~wire&~duplicate],minlength=used.shape[-1]+1)
+	return '%s: %d LUTs, %d constant, %d wires, %s, %d shared across filters, %d physical LUTs saved'%(name,len(inputs),
+		constants,wires,', '.join(['%d LUT%d'%(n,k) for k,n in enumerate(sizes) if k and n]),shared,constants+wires+shared)
+
+def lut_verilog(style,name,out,inputs,init):
+	'''Verilog of a LUT named name driving out from inputs (MSB first), with the INIT constant init of lut_inits.
+	LUTs without inputs and single-input LUTs that pass their input through are written as plain assignments.
+	'''
+	K=len(inputs)
+	if K==0:
+		return "assign %s = 1'b%s;\n"%(out,init)
+	if K==1 and init=='2':
+		return 'assign %s = %s;\n'%(out,inputs[0])
+	const=str(2**K)+"'h"+init
+	if style=='init':
+		if K>6:
+			raise ValueError('there is no LUT%d primitive'%K)
+		pins=''.join(['.I%d(%s), '%(K-1-i,x) for i,x in enumerate(inputs)])
+		return 'LUT%d #(.INIT(%s)) %s (%s.O(%s));\n'%(K,const,name,pins,out)
+	if style=='rom':
+		return 'assign %s = %s >> {%s};\n'%(out,const,', '.join(inputs))
+	raise ValueError('unknown LUT style '+style)
+
+class Buffer(object):
+	'''In-memory output file: writes are collected as a list of chunks and joined once.'''
+	def __init__(self,text=''):
+		self.chunks=[text] if text else []
+	def write(self,text):
+		self.chunks.append(text)
+	def getvalue(self):
+		return ''.join(self.chunks)
+	def __enter__(self):
+		return self
+	def __exit__(self,*exc):
+		return False
+
+class Outputs(object):
+	'''The output files of a generator script, buffered until commit().
+	open(path,mode) stands in for the builtin open: 'w' starts path afresh, 'a' appends to it, so the scripts can keep
+	reopening their files per layer at no cost.
+	'''
+	def __init__(self):
+		self.files=OrderedDict()
+	def open(self,path,mode='w'):
+		if mode=='w':
+			self.files[path]=Buffer()
+		elif path not in self.files:
+			text=''
+			if os.path.exists(path):
+				with open(path) as f:
+					text=f.read()
+			self.files[path]=Buffer(text)
+		return self.files[path]
+	def commit(self):
+		'''Writes every file to path.tmp and, once all are written, renames them into place.'''
+		for path,buf in self.files.items():
+			d=os.path.dirname(path)
+			if d and not os.path.isdir(d):
+				os.makedirs(d)
+			with open(path+'.tmp','w') as f:
+				f.write(buf.getvalue())
+		for path in self.files:
+			os.rename(path+'.tmp',path)
+		self.files=OrderedDict()
@@ -3,7 +3,6 @@ import pickle
 import matplotlib.pyplot as plt
 import matplotlib
 import keras
-from keras.datasets import cifar10,mnist
 from keras.utils import np_utils
 from keras.optimizers import SGD
 from keras import backend as K
@@ -12,9 +11,11 @@ from keras.preprocessing.image import ImageDataGenerator
 import os
 os.environ["CUDA_VISIBLE_DEVICES"]="1"
 import sys
-sys.path.insert(0, '..')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),'..')) # also when run from another working directory, as prune_sweep.py does
 from binarization_utils import *
 from model_architectures import get_model
+from dataset_cache import load_dataset
+from data_parallel import DataParallel, train_data_parallel, shuffled_flow
 
 dataset = sys.argv[1]
 Train = sys.argv[2] == 'True'
@@ -25,8 +26,22 @@ BINARY = sys.argv[6] == 'True'
 trainable_means = sys.argv[7] == 'True'
 Evaluate = sys.argv[8] == 'True'
 epochs = int(sys.argv[9])
+opts = dict(arg.split('=',1) for arg in sys.argv[10:]) # optional name=value arguments, e.g. lut_impl=batched
+lut_impl = opts.get('lut_impl','batched')
+lut_k = int(opts.get('lut_k',5)) # LUTNet microarchitecture: (K,N)-LUTs, N of whose inputs are sourced from BRAM
+lut_n = int(opts.get('lut_n',1))
+recompute = opts.get('recompute','False') == 'True' # recompute LUT expansions in the backward pass to save activation memory
+input_pipeline = opts.get('input_pipeline','generator') # CIFAR-10/SVHN training input: 'generator' (ImageDataGenerator.flow) or 'tfdata' (TF dataset API, parallel augmentation and prefetch)
+cache = opts.get('cache') # tfdata only: cache the normalised training set, in memory for 'cache=' or in the given file
+map_workers = int(opts['map_workers']) if 'map_workers' in opts else None # tfdata only: parallel augmentation calls, one per CPU by default
+data_cache = opts.get('data_cache') # directory of the uint8 .npy dataset cache: the arrays are memory-mapped and the model scales each batch to [-1,1]
+uint8_input = data_cache is not None or opts.get('uint8','False') == 'True' # keep the images as uint8 and let the model scale each batch to [-1,1]
+workers = int(opts.get('workers',0)) # data-parallel training in this many local worker processes, each on its own CPUs and shard of the training set
+sync_every = int(opts.get('sync_every',1)) # data-parallel only: training steps between weight averages
+single_worker_ips = float(opts['single_worker_ips']) if 'single_worker_ips' in opts else None # data-parallel only: images/s of a workers=1 run, to report speedup and scaling efficiency against
 
 batch_size=100
+im2col_budget = int(opts['im2col_mb'])*2**20/batch_size if 'im2col_mb' in opts else None # per-batch MB of LUT conv intermediates, split per example
 
 print('Dataset is ', dataset)
 print('Train is ', Train)
@@ -36,52 +51,98 @@ print('LUT is ', LUT)
 print('BINARY is ', BINARY)
 print('trainable_means is ', trainable_means)
 print('Evaluate is ', Evaluate)
+print('lut_impl is ', lut_impl)
+print('LUT microarchitecture is ', (lut_k,lut_n))
+print('im2col_budget is ', im2col_budget)
+print('recompute is ', recompute)
+print('input_pipeline is ', input_pipeline)
+print('data_cache is ', data_cache)
+print('uint8_input is ', uint8_input)
+print('workers is ', workers)
+print('sync_every is ', sync_every)
+print('single_worker_ips is ', single_worker_ips)
 
 def l2_reg(weight_matrix):
 	return 5e-7 * K.sqrt(K.sum(K.abs(weight_matrix)**2))
 
-def load_svhn(path_to_dataset):
-	import scipy.io as sio
-	train=sio.loadmat(path_to_dataset+'/train.mat')
-	test=sio.loadmat(path_to_dataset+'/test.mat')
-	extra=sio.loadmat(path_to_dataset+'/extra.mat')
-	X_train=np.transpose(train['X'],[3,0,1,2])
-	y_train=train['y']-1
+def tfdata_flow(X,y,batch_size,horizontal_flip,shift_range=0.15,cache=None,map_workers=None,prefetch=2,normalise=True):
+	'''Endless generator of augmented training batches built with the TF dataset API, a drop-in for ImageDataGenerator.flow.
+	uint8 images are normalised to [-1,1] inside the pipeline, unless normalise is False because the model scales its input,
+	and, if cache is not None, cached after normalisation ('' for memory or a file name).
+	Shifts by up to shift_range of the image size (whole pixels, nearest fill) and flips run in map_workers parallel calls and batches are prefetched,
+	so augmentation overlaps the training step instead of running in the Python generator thread.
+	'''
+	import multiprocessing
+	map_workers=map_workers or multiprocessing.cpu_count()
+	h,w=X.shape[1:3]
+	X_in=tf.placeholder(X.dtype,X.shape)
+	y_in=tf.placeholder(y.dtype,y.shape)
+	def scale(x,y):
+		x=tf.cast(x,tf.float32)
+		if normalise and X.dtype==np.uint8:
+			x=2*(x/255)-1
+		return x,y
+	def augment(x,y):
+		dy=tf.random_uniform([],-int(shift_range*h),int(shift_range*h)+1,dtype=tf.int32)
+		dx=tf.random_uniform([],-int(shift_range*w),int(shift_range*w)+1,dtype=tf.int32)
+		x=tf.gather(x,tf.clip_by_value(tf.range(h)-dy,0,h-1))
+		x=tf.gather(x,tf.clip_by_value(tf.range(w)-dx,0,w-1),axis=1)
+		if horizontal_flip:
+			x=tf.image.random_flip_left_right(x)
+		return x,y
+	ds=tf.data.Dataset.from_tensor_slices((X_in,y_in))
+	if cache is not None:
+		ds=ds.map(scale,num_parallel_calls=map_workers).cache(cache).shuffle(X.shape[0]).repeat()
+		ds=ds.map(augment,num_parallel_calls=map_workers)
+	else:
+		ds=ds.shuffle(X.shape[0]).repeat()
+		ds=ds.map(lambda x,y: augment(*scale(x,y)),num_parallel_calls=map_workers)
+	it=ds.batch(batch_size).prefetch(prefetch).make_initializable_iterator()
+	batch=it.get_next()
+	sess=K.get_session()
+	sess.run(it.initializer,feed_dict={X_in:X,y_in:y})
+	def batches():
+		while True:
+			yield sess.run(batch)
+	return batches()
 
-	X_test=np.transpose(test['X'],[3,0,1,2])
-	y_test=test['y']-1
-
-	X_extra=np.transpose(extra['X'],[3,0,1,2])
-	y_extra=extra['y']-1
-
-	X_train=np.concatenate((X_train,X_extra),axis=0)
-	y_train=np.concatenate((y_train,y_extra),axis=0)
-
-	return (X_train,y_train),(X_test,y_test)
+def uint8_flow(X,y,batch_size,horizontal_flip,shift_range=0.15):
+	'''Endless generator of augmented uint8 training batches, for models that scale their input (uint8_input).
+	Unlike ImageDataGenerator.flow, which keeps a float32 copy of the whole training set, only the images of the current batch are copied.
+	Images are shifted by up to shift_range of the image size (whole pixels, nearest fill) and flipped by indexing.
+	'''
+	n,h,w=X.shape[:3]
+	dh,dw=int(shift_range*h),int(shift_range*w)
+	while True:
+		order=np.random.permutation(n)
+		for i in range(0,n-batch_size+1,batch_size):
+			idx=np.sort(order[i:i+batch_size]) # sorted reads are sequential for memory-mapped arrays
+			rows=np.clip(np.arange(h)-np.random.randint(-dh,dh+1,size=(batch_size,1)),0,h-1)
+			cols=np.clip(np.arange(w)-np.random.randint(-dw,dw+1,size=(batch_size,1)),0,w-1)
+			if horizontal_flip:
+				flip=np.random.rand(batch_size,1)<0.5
+				cols=np.where(flip,cols[:,::-1],cols)
+			yield X[idx][np.arange(batch_size)[:,None,None],rows[:,:,None],cols[:,None,:]],y[idx]
 
+(X_train, y_train), (X_test, y_test) = load_dataset(dataset,data_cache)
 if dataset=="MNIST":
-	(X_train, y_train), (X_test, y_test) = mnist.load_data()
 	# convert class vectors to binary class matrices
 	X_train = X_train.reshape(-1,784)
 	X_test = X_test.reshape(-1,784)
 	use_generator=False
-elif dataset=="CIFAR-10":
-	use_generator=True
-	(X_train, y_train), (X_test, y_test) = cifar10.load_data()
-elif dataset=="SVHN":
-	use_generator=True
-	(X_train, y_train), (X_test, y_test) = load_svhn('./svhn_data')
 else:
-	raise("dataset should be one of the following: [MNIST, CIFAR-10, SVHN].")
+	use_generator=True
 
-X_train=X_train.astype(np.float32)
-X_test=X_test.astype(np.float32)
+X_train_uint8=X_train # kept for the tfdata pipeline, which normalises on the fly
 Y_train = np_utils.to_categorical(y_train, 10)
 Y_test = np_utils.to_categorical(y_test, 10)
-X_train /= 255
-X_test /= 255
-X_train=2*X_train-1
-X_test=2*X_test-1
+if not uint8_input:
+	X_train=X_train.astype(np.float32)
+	X_test=X_test.astype(np.float32)
+	X_train /= 255
+	X_test /= 255
+	X_train=2*X_train-1
+	X_test=2*X_test-1
 
 
 print('X_train shape:', X_train.shape)
@@ -99,8 +160,48 @@ if Train:
 		os.mkdir('models/'+dataset)
 	for resid_levels in range(2,3): #range(1,4):
 		print 'training with', resid_levels,'levels'
+		tile_reg=5e-7 if REG and not LUT and not Retrain else 0 # L2 loss on the tile-averaged weights of the layers that become LUTNet layers
+		lr=0.01
+		decay=1e-6
+		def build_model():
+			model=get_model(dataset,resid_levels,LUT,BINARY,trainable_means,lut_impl=lut_impl,LUT_K=lut_k,LUT_N=lut_n,im2col_budget=im2col_budget,recompute=recompute,tile_reg=tile_reg,uint8_input=uint8_input)
+			if Retrain:
+				weights_path='models/'+dataset+'/pretrained_pruned.h5'
+				model.load_weights(weights_path)
+			elif LUT and not REG:
+				weights_path='models/'+dataset+'/pretrained_bin.h5'
+				model.load_weights(weights_path)
+
+			opt = keras.optimizers.Adam(lr=lr,decay=decay)#SGD(lr=lr,momentum=0.9,decay=1e-5)
+			model.compile(loss='sparse_categorical_crossentropy',optimizer=opt,metrics=['accuracy'])
+			return model
+
+		if dataset=="CIFAR-10":
+			horizontal_flip=True
+		if dataset=="SVHN":
+			horizontal_flip=False
+		def make_flow(X,y):
+			if not use_generator:
+				return shuffled_flow(X,y,batch_size)
+			if input_pipeline=='tfdata':
+				return tfdata_flow(X,y,batch_size,horizontal_flip,cache=cache,map_workers=map_workers,normalise=not uint8_input)
+			elif uint8_input:
+				return uint8_flow(X,y,batch_size,horizontal_flip)
+			else:
+				datagen = ImageDataGenerator(
+					width_shift_range=0.15,  # randomly shift images horizontally (fraction of total width)
+					height_shift_range=0.15,  # randomly shift images vertically (fraction of total height)
+					horizontal_flip=horizontal_flip)  # randomly flip images
+				return datagen.flow(X, y,batch_size=batch_size)
+
+		X_flow=X_train_uint8 if input_pipeline=='tfdata' else X_train
+		if workers:
+			# forked before this process creates its TF session; worker i trains on the i-th contiguous shard of the training set
+			n=X_train.shape[0]
+			pool=DataParallel(build_model,lambda i: make_flow(X_flow[i*n//workers:(i+1)*n//workers],y_train[i*n//workers:(i+1)*n//workers]),workers,batch_size,sync_every)
+
 		sess=K.get_session()
-		model=get_model(dataset,resid_levels,LUT,BINARY,trainable_means)
+		model=build_model()
 		#model.summary()
 
 		#gather all binary dense and binary convolution layers:
@@ -114,193 +215,21 @@ if Train:
 		for l in model.layers:
 			if isinstance(l,Residual_sign):
 				resid_bin_layers.append(l)
-		lr=0.01
-		decay=1e-6
-
-		if Retrain:
-			weights_path='models/'+dataset+'/pretrained_pruned.h5'
-			model.load_weights(weights_path)
-		elif LUT and not REG:
-			weights_path='models/'+dataset+'/pretrained_bin.h5'
-			model.load_weights(weights_path)
-		elif REG and not LUT:
-			vars   = tf.trainable_variables() 
-			if dataset == 'CIFAR-10' or dataset == 'SVHN':
-				for v in vars: 
-					if 'binary_conv_2' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TRC = 1
-						TM = 8
-						TN = 8
-						Tsize_RC = 3/TRC
-						Tsize_M = 64/TM
-						Tsize_N = 64/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								for rc in range(TRC):
-									norm = norm + v[(rc*Tsize_RC):((rc+1)*Tsize_RC),(rc*Tsize_RC):((rc+1)*Tsize_RC),(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TRC*TRC*TM*TN)
-						lossL2 = tf.nn.l2_loss(norm)*5e-7
-					if 'binary_conv_3' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TRC = 1
-						TM = 8
-						TN = 8
-						Tsize_RC = 3/TRC
-						Tsize_M = 64/TM
-						Tsize_N = 128/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								for rc in range(TRC):
-									norm = norm + v[(rc*Tsize_RC):((rc+1)*Tsize_RC),(rc*Tsize_RC):((rc+1)*Tsize_RC),(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TRC*TRC*TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-					if 'binary_conv_4' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TRC = 1
-						TM = 8
-						TN = 8
-						Tsize_RC = 3/TRC
-						Tsize_M = 128/TM
-						Tsize_N = 128/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								for rc in range(TRC):
-									norm = norm + v[(rc*Tsize_RC):((rc+1)*Tsize_RC),(rc*Tsize_RC):((rc+1)*Tsize_RC),(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TRC*TRC*TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-					if 'binary_conv_5' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TRC = 1
-						TM = 8
-						TN = 8
-						Tsize_RC = 3/TRC
-						Tsize_M = 128/TM
-						Tsize_N = 256/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								for rc in range(TRC):
-									norm = norm + v[(rc*Tsize_RC):((rc+1)*Tsize_RC),(rc*Tsize_RC):((rc+1)*Tsize_RC),(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TRC*TRC*TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-					if 'binary_conv_6' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TRC = 1
-						TM = 8
-						TN = 8
-						Tsize_RC = 3/TRC
-						Tsize_M = 256/TM
-						Tsize_N = 256/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								for rc in range(TRC):
-									norm = norm + v[(rc*Tsize_RC):((rc+1)*Tsize_RC),(rc*Tsize_RC):((rc+1)*Tsize_RC),(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TRC*TRC*TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-					if 'binary_dense_1' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TM = 8
-						TN = 8
-						Tsize_M = 256/TM
-						Tsize_N = 512/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								norm = norm + v[(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-					if 'binary_dense_2' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TM = 8
-						TN = 8
-						Tsize_M = 512/TM
-						Tsize_N = 512/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								norm = norm + v[(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-					if 'binary_dense_3' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TM = 8
-						TN = 10
-						Tsize_M = 512/TM
-						Tsize_N = 10/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								norm = norm + v[(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-
-			elif dataset == 'MNIST':
-				for v in vars: 
-					if 'binary_dense_2' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TM = 8
-						TN = 8
-						Tsize_M = 256/TM
-						Tsize_N = 256/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								norm = norm + v[(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TM*TN)
-						lossL2 = tf.nn.l2_loss(norm)*5e-7
-					if 'binary_dense_3' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TM = 8
-						TN = 8
-						Tsize_M = 256/TM
-						Tsize_N = 256/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								norm = norm + v[(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-					if 'binary_dense_4' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TM = 8
-						TN = 8
-						Tsize_M = 256/TM
-						Tsize_N = 256/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								norm = norm + v[(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-					if 'binary_dense_5' in v.name and 'Variable_' in v.name: # reg applied onto LUTNet layers only
-						TM = 8
-						TN = 10
-						Tsize_M = 256/TM
-						Tsize_N = 10/TN
-						norm = 0
-						for n in range(TN):
-							for m in range(TM):
-								norm = norm + v[(m*Tsize_M):((m+1)*Tsize_M),(n*Tsize_N):((n+1)*Tsize_N)]
-						norm = norm / (TM*TN)
-						lossL2 = lossL2 + tf.nn.l2_loss(norm)*5e-7
-
-
-			model.add_loss( lossL2 )
-
-		opt = keras.optimizers.Adam(lr=lr,decay=decay)#SGD(lr=lr,momentum=0.9,decay=1e-5)
-		model.compile(loss='sparse_categorical_crossentropy',optimizer=opt,metrics=['accuracy'])
 
 
 		weights_path='models/'+dataset+'/'+str(resid_levels)+'_residuals.h5'
 		cback=keras.callbacks.ModelCheckpoint(weights_path, monitor='val_acc', save_best_only=True)
-		if use_generator:
-			if dataset=="CIFAR-10":
-				horizontal_flip=True
-			if dataset=="SVHN":
-				horizontal_flip=False
-			datagen = ImageDataGenerator(
-				width_shift_range=0.15,  # randomly shift images horizontally (fraction of total width)
-				height_shift_range=0.15,  # randomly shift images vertically (fraction of total height)
-				horizontal_flip=horizontal_flip)  # randomly flip images
+		if workers:
+			history=keras.callbacks.History()
+			history.history=train_data_parallel(pool,model,X_train.shape[0]//(workers*batch_size),epochs,(X_test,y_test),weights_path,single_worker_ips)
+			pool.close()
+		elif use_generator:
+			flow=make_flow(X_flow,y_train)
 			if keras.__version__[0]=='2':
-				history=model.fit_generator(datagen.flow(X_train, y_train,batch_size=batch_size),steps_per_epoch=X_train.shape[0]/batch_size,
+				history=model.fit_generator(flow,steps_per_epoch=X_train.shape[0]/batch_size,
 				nb_epoch=epochs,validation_data=(X_test, y_test),verbose=2,callbacks=[cback])
 			if keras.__version__[0]=='1':
-				history=model.fit_generator(datagen.flow(X_train, y_train,batch_size=batch_size), samples_per_epoch=X_train.shape[0], 
+				history=model.fit_generator(flow, samples_per_epoch=X_train.shape[0], 
 				nb_epoch=epochs, verbose=2,validation_data=(X_test,y_test),callbacks=[cback])
 
 		else:
@@ -316,7 +245,7 @@ if Train:
 if Evaluate:
 	for resid_levels in range(2,3):
 		weights_path='models/'+dataset+'/'+str(resid_levels)+'_residuals.h5'
-		model=get_model(dataset,resid_levels,LUT,BINARY,trainable_means)
+		model=get_model(dataset,resid_levels,LUT,BINARY,trainable_means,lut_impl=lut_impl,LUT_K=lut_k,LUT_N=lut_n,im2col_budget=im2col_budget,recompute=recompute,uint8_input=uint8_input)
 		model.load_weights(weights_path)
 		opt = keras.optimizers.Adam()
 		model.compile(loss='categorical_crossentropy',optimizer=opt,metrics=['accuracy'])
@@ -0,0 +1,58 @@
+'''Dataset loading for Binary.py, with an optional on-disk cache.
+
+With a cache directory, each dataset is converted once into uint8 .npy files (images and labels per split) and later runs
+memory-map these instead of reloading the raw data, which for SVHN means parsing the train, test and extra .mat files.
+'''
+import os
+import numpy as np
+
+splits=['X_train','y_train','X_test','y_test']
+
+def load_svhn(path_to_dataset):
+	import scipy.io as sio
+	train=sio.loadmat(path_to_dataset+'/train.mat')
+	test=sio.loadmat(path_to_dataset+'/test.mat')
+	extra=sio.loadmat(path_to_dataset+'/extra.mat')
+	X_train=np.transpose(train['X'],[3,0,1,2])
+	y_train=train['y']-1
+
+	X_test=np.transpose(test['X'],[3,0,1,2])
+	y_test=test['y']-1
+
+	X_extra=np.transpose(extra['X'],[3,0,1,2])
+	y_extra=extra['y']-1
+
+	X_train=np.concatenate((X_train,X_extra),axis=0)
+	y_train=np.concatenate((y_train,y_extra),axis=0)
+
+	return (X_train,y_train),(X_test,y_test)
+
+def load_raw(dataset):
+	if dataset=="MNIST":
+		from keras.datasets import mnist
+		return mnist.load_data()
+	elif dataset=="CIFAR-10":
+		from keras.datasets import cifar10
+		return cifar10.load_data()
+	elif dataset=="SVHN":
+		return load_svhn('./svhn_data')
+	else:
+		raise ValueError("dataset should be one of the following: [MNIST, CIFAR-10, SVHN].")
+
+def load_dataset(dataset,cache_dir=None):
+	'''(X_train,y_train),(X_test,y_test) as uint8 arrays, memory-mapped read-only from cache_dir if given.
+	The cache is written on first use, each file under a temporary name first so that an interrupted conversion is redone.
+	'''
+	if cache_dir is None:
+		return load_raw(dataset)
+	paths=[os.path.join(cache_dir,'%s_%s.npy'%(dataset,s)) for s in splits]
+	if not all(os.path.exists(p) for p in paths):
+		if not os.path.exists(cache_dir):
+			os.makedirs(cache_dir)
+		(X_train,y_train),(X_test,y_test)=load_raw(dataset)
+		for p,a in zip(paths,[X_train,y_train,X_test,y_test]):
+			with open(p+'.tmp','wb') as f:
+				np.save(f,np.ascontiguousarray(a,np.uint8))
+			os.rename(p+'.tmp',p)
+	X_train,y_train,X_test,y_test=[np.load(p,mmap_mode='r') for p in paths]
+	return (X_train,y_train),(X_test,y_test)
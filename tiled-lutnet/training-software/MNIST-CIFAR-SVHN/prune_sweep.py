@@ -0,0 +1,143 @@
+'''Parallel sweep over the pruning thresholds of models/<dataset>/scripts/bnn_pruning.py.
+
+Every job prunes baseline_reg.h5 with its own thresholds, retrains the pruned BNN for a few epochs (the first
+Binary.py stage of lutnet_training_script.sh) and records the best test accuracy of the retraining together with
+the number of surviving LUTs, i.e. the pruning mask entries left in the LUT layers (all binary layers but the first).
+Jobs run in a local process pool, each in its own working directory under out/job_<i>, pinned to its own block of
+CPUs. Finished jobs leave a result.json there and are not rerun, so an interrupted sweep can be restarted.
+Results are appended to out/results.csv as jobs finish.
+
+Thresholds are given as name=values: a comma-separated list (p_c3=1.0,1.1,1.2) is searched as a grid over all
+listed thresholds, a range (p_c3=0.9:1.3) is sampled uniformly in a random search of samples=N jobs, in which lists
+are sampled from as well. Thresholds not given keep their bnn_pruning.py defaults. seed=S seeds the random search
+and out=DIR sets the output directory (default sweeps/<dataset>); all other name=value arguments are passed to
+Binary.py, e.g. data_cache=/data/cache.
+
+Usage: python prune_sweep.py <dataset> <retrain_epochs> <jobs> [name=values ...]
+'''
+import os
+import sys
+import csv
+import json
+import time
+import pickle
+import itertools
+import subprocess
+import multiprocessing
+import numpy as np
+
+here=os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here,'..'))
+from lut_inference import load_weights
+from data_parallel import cpu_sets
+
+pruning_opts=('normalisation',)
+
+def parse_space(args):
+	'''(name -> list of values or (lo,hi) range) of the threshold arguments.'''
+	space={}
+	for name,values in args:
+		if ':' in values:
+			lo,hi=values.split(':')
+			space[name]=(float(lo),float(hi))
+		else:
+			space[name]=[float(v) for v in values.split(',')]
+	return space
+
+def sample_space(space,samples,seed=0):
+	'''The threshold settings to run: the full grid if all entries are lists, otherwise samples random draws.'''
+	names=sorted(space)
+	if all(isinstance(space[n],list) for n in names):
+		return [dict(zip(names,v)) for v in itertools.product(*[space[n] for n in names])]
+	rng=np.random.RandomState(seed)
+	settings=[]
+	for _ in range(samples):
+		settings.append(dict((n,float(rng.choice(space[n])) if isinstance(space[n],list) else float(rng.uniform(*space[n]))) for n in names))
+	return settings
+
+def surviving_luts(path):
+	'''Surviving LUTs per LUT layer (pruning mask entries left in every binary layer but the first) of a Keras .h5 file.'''
+	layers=[(name,w) for name,w in load_weights(path)[0] if name.startswith('binary_')]
+	return dict((name,int(np.sum(w['pruning_mask:0']))) for name,w in layers[1:])
+
+def pin(cpus):
+	if hasattr(os,'sched_setaffinity'): # inherited by the pruning and training subprocesses
+		os.sched_setaffinity(0,cpus.get())
+
+def run_job(job):
+	'''Prune, retrain and evaluate one threshold setting in job['dir']; returns its results row.'''
+	d=job['dir']
+	result_path=os.path.join(d,'result.json')
+	if os.path.exists(result_path):
+		with open(result_path) as f:
+			return json.load(f)
+	dataset=job['dataset']
+	scripts=os.path.join(here,'models',dataset,'scripts')
+	model_dir=os.path.join(d,'models',dataset)
+	if not os.path.exists(model_dir):
+		os.makedirs(model_dir)
+	for src,dst in [(os.path.join(scripts,'baseline_reg.h5'),'baseline_reg.h5'),(os.path.join(here,'svhn_data'),'svhn_data')]:
+		if os.path.exists(src) and not os.path.exists(os.path.join(d,dst)):
+			os.symlink(src,os.path.join(d,dst))
+	row=dict(job['thresholds'],job=job['id'],status='ok')
+	t=time.time()
+	with open(os.path.join(d,'output.txt'),'w') as log:
+		pruning_args=['%s=%r'%kv for kv in sorted(job['thresholds'].items())]+['%s=%s'%kv for kv in sorted(job['pruning_opts'].items())]
+		if subprocess.call([sys.executable,os.path.join(scripts,'bnn_pruning.py')]+pruning_args,cwd=d,stdout=log,stderr=subprocess.STDOUT):
+			row['status']='pruning failed'
+			return row
+		pruned=os.path.join(model_dir,'pretrained_pruned.h5')
+		os.rename(os.path.join(d,'pretrained_pruned.h5'),pruned)
+		luts=surviving_luts(pruned)
+		row.update(luts)
+		row['luts']=sum(luts.values())
+		# Train, REG, Retrain, LUT, BINARY, trainable_means, Evaluate as for the pruned BNN in lutnet_training_script.sh
+		args=[dataset,'True','False','True','False','True','True','False',str(job['epochs'])]+['%s=%s'%kv for kv in sorted(job['binary_opts'].items())]
+		if subprocess.call([sys.executable,os.path.join(here,'Binary.py')]+args,cwd=d,stdout=log,stderr=subprocess.STDOUT):
+			row['status']='retraining failed'
+			return row
+	with open(os.path.join(model_dir,'history_2_residuals.pkl'),'rb') as f:
+		history=pickle.load(f)['hard']
+	row['val_acc']=float(max(history['val_acc']))
+	row['seconds']=round(time.time()-t,1)
+	with open(result_path,'w') as f:
+		json.dump(row,f)
+	return row
+
+if __name__ == "__main__":
+	dataset=sys.argv[1]
+	epochs=int(sys.argv[2])
+	jobs=int(sys.argv[3])
+	opts=[arg.split('=',1) for arg in sys.argv[4:]]
+	space=parse_space([(n,v) for n,v in opts if n.startswith('p_')])
+	pruning=dict((n,v) for n,v in opts if n in pruning_opts)
+	sweep=dict((n,v) for n,v in opts if n in ('samples','seed','out'))
+	binary_opts=dict((n,v) for n,v in opts if not n.startswith('p_') and n not in pruning_opts and n not in sweep)
+	out=os.path.abspath(sweep.get('out',os.path.join('sweeps',dataset)))
+	settings=sample_space(space,int(sweep.get('samples',20)),int(sweep.get('seed',0)))
+	print('%d jobs on %d workers, results in %s' % (len(settings),jobs,out))
+
+	job_list=[dict(id=i,dir=os.path.join(out,'job_%d'%i),dataset=dataset,epochs=epochs,thresholds=s,pruning_opts=pruning,binary_opts=binary_opts)
+		for i,s in enumerate(settings)]
+	cpus=multiprocessing.Queue()
+	for c in cpu_sets(jobs):
+		cpus.put(c)
+	pool=multiprocessing.Pool(jobs,initializer=pin,initargs=(cpus,))
+	layers=sorted(surviving_luts(os.path.join(here,'models',dataset,'scripts','baseline_reg.h5')))
+	if not os.path.exists(out):
+		os.makedirs(out)
+	rows=[]
+	with open(os.path.join(out,'results.csv'),'w') as f:
+		writer=csv.DictWriter(f,['job','status']+sorted(space)+['luts','val_acc','seconds']+layers,extrasaction='ignore')
+		writer.writeheader()
+		for row in pool.imap_unordered(run_job,job_list):
+			writer.writerow(row)
+			f.flush()
+			rows.append(row)
+			print('job %d: %s, %s LUTs, val_acc %s' % (row['job'],row['status'],row.get('luts','-'),row.get('val_acc','-')))
+	pool.close()
+	pool.join()
+
+	print('%6s %10s %8s  %s' % ('job','luts','val_acc','thresholds'))
+	for row in sorted([r for r in rows if r['status']=='ok'],key=lambda r: r['luts']):
+		print('%6d %10d %8.4f  %s' % (row['job'],row['luts'],row['val_acc'],' '.join('%s=%g'%(n,row[n]) for n in sorted(space))))
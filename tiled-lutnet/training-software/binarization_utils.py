@@ -27,6 +27,114 @@ def binarize(x):
     rounded = K.sign(clipped)
     return clipped + K.stop_gradient(rounded - clipped)
 
+def lut_minterms(pos,neg,axis):
+	'''Stacks every minterm of a LUT's inputs along a new truth-table axis inserted at `axis`.
+	pos[i]/neg[i] are the selectors of the ith LUT input. Bit i (MSB first) of a minterm index picks neg[i] when set, which is the row order of the stacked c truth table.
+	'''
+	m=tf.stack([pos[0],neg[0]],axis=axis)
+	for p,n in zip(pos[1:],neg[1:]):
+		p=tf.expand_dims(p,axis)
+		n=tf.expand_dims(n,axis)
+		m=tf.stack([m*p,m*n],axis=axis+1)
+		shape=[-1 if d is None else d for d in m.get_shape().as_list()]
+		shape[axis:axis+2]=[shape[axis]*2]
+		m=tf.reshape(m,shape)
+	return m
+
+def lut_selectors(x,shuf):
+	'''Lagrangian interpolating polynomial selectors of the LUT activation inputs.
+	x is the first input, whose magnitude is the trainable scaling factor of its binary level, shuf the list of randomly connected inputs.
+	'''
+	b=[binarize(t) for t in [x]+list(shuf)] # each input binarised once, shared by its pos and neg selectors
+	pos=[(1+b[0])/2*abs(x)]+[(1+t)/2 for t in b[1:]]
+	neg=[(1-b[0])/2*abs(x)]+[(1-t)/2 for t in b[1:]]
+	return pos,neg
+
+def lut_shuffle(x,idx,n):
+	'''Randomly connected LUT inputs of x [R,P], gathered in a single op along the last axis.
+	idx holds the n randomisation maps concatenated as one int32 vector of length n*P.
+	'''
+	if n==0:
+		return []
+	return tf.split(tf.gather(x,idx,axis=1),n,axis=1)
+
+def lut_gather(x,shuf,w):
+	'''LUT output [R,F] of the first inputs x [R,P] and randomly connected inputs shuf, read from the [T,P,F] effective LUT weights w
+	at the minterm addressed by the input signs. Same as lut_contract(lut_minterms(*lut_selectors(x,shuf),axis=1),w), as only that
+	minterm is non-zero, but in P*F instead of T*P*F multiply-adds per row: the forward pass is a sparse product with one non-zero,
+	abs(x), per position, i.e. a gather of the rows of w, and the gradient of w the matching scatter-add.
+	Fewer multiply-adds do not make it faster: on CPU the sparse products and [R,P,F] row gathers run well below the dense matmuls of
+	'batched', which stays several times faster for the conv layers.
+	Input gradients are the straight-through ones of the product form. A selector's gradient only involves the addressed minterm and
+	the one differing from it in that selector's input, so dy is reduced against the rows of w gathered at those len(shuf)+2 minterms
+	instead of the whole dense dy.w^T.
+	Inputs exactly equal to zero select the positive minterm instead of splitting evenly between both.
+	'''
+	t,p,f=w.get_shape().as_list()
+	n=len(shuf)+1
+	@tf.custom_gradient
+	def gather(w,*inputs):
+		idx=0
+		for v in inputs:
+			idx=idx*2+tf.cast(v<0,tf.int32) # [R,P] minterm index, first input in the most significant bit
+		rows=tf.shape(idx)[0]
+		pos=tf.range(p)
+		nz=tf.stack([tf.reshape(tf.tile(tf.expand_dims(tf.range(rows),1),[1,p]),[-1]),tf.reshape(idx*p+pos,[-1])],axis=1)
+		m=tf.SparseTensor(tf.cast(nz,tf.int64),tf.reshape(abs(inputs[0]),[-1]),tf.cast(tf.stack([rows,t*p]),tf.int64))
+		w_flat=tf.reshape(w,[t*p,f])
+		def grad(dy):
+			dw=tf.reshape(tf.sparse_tensor_dense_matmul(m,dy,adjoint_a=True),[t,p,f])
+			dy_col=tf.expand_dims(dy,2)
+			dm_at=lambda i: tf.squeeze(tf.matmul(tf.gather(w_flat,i*p+pos),dy_col),2) # [R,P] product of dy with the w rows of minterms i
+			dm_idx=dm_at(idx)
+			xs=[tf.identity(v) for v in inputs] # fresh tensors, so that shuffled inputs derived from x are not differentiated twice
+			sel_pos,sel_neg=lut_selectors(xs[0],xs[1:])
+			dpos,dneg=[],[]
+			for i in range(n):
+				bit=1<<(n-1-i)
+				scale=1 if i==0 else abs(inputs[0]) # the other selectors of these minterms are 1, and abs(x) for the first input
+				dm_flip=dm_at(tf.bitwise.bitwise_xor(idx,bit))
+				neg=tf.not_equal(tf.bitwise.bitwise_and(idx,bit),0) # idx is its own neighbour on the side of its sign
+				dpos.append(tf.where(neg,dm_flip,dm_idx)*scale)
+				dneg.append(tf.where(neg,dm_idx,dm_flip)*scale)
+			return [dw]+tf.gradients(sel_pos+sel_neg,xs,grad_ys=dpos+dneg)
+		return tf.sparse_tensor_dense_matmul(m,w_flat),grad
+	return gather(w,x,*shuf)
+
+def lut_weights(c,ws_pos,ws_neg):
+	'''Folds the BRAM-sourced LUT inputs into the LUT contents.
+	c is the stacked [2^K,P,F] truth table, already pruned, and ws_pos/ws_neg the [P,F] selectors of the BRAM inputs.
+	Returns the [2^(K-N),P,F] effective weights seen by each activation minterm.
+	'''
+	ws=lut_minterms(ws_pos,ws_neg,0)
+	c=tf.reshape(c,[-1,int(ws.get_shape()[0])]+c.get_shape().as_list()[1:])
+	return tf.reduce_sum(c*ws,axis=1)
+
+def lut_recompute(f,*inputs):
+	'''Evaluates f(*inputs) keeping only the inputs alive for backprop.
+	The backward pass rebuilds f on fresh copies of the inputs and differentiates that, trading compute for activation memory.
+	'''
+	@tf.custom_gradient
+	def recompute(*inputs):
+		def grad(dy):
+			with tf.control_dependencies([dy]): # not before the backward pass reaches this point, otherwise nothing is saved
+				xs=[tf.identity(t) for t in inputs]
+			return tf.gradients(f(*xs),xs,grad_ys=dy)
+		return f(*inputs),grad
+	return recompute(*inputs)
+
+def lut_contract(m,w):
+	'''Contracts [R,T,P] stacked minterms against [T,P,F] LUT weights in a single matmul.'''
+	t,p=m.get_shape().as_list()[1:]
+	return K.dot(tf.reshape(m,[-1,t*p]),tf.reshape(w,[t*p,-1]))
+
+def tile_mean(w,tiling):
+	'''Mean over the tiles of w, split tiling[i] times along axis i: a tensor of the tile size, as replicated by tf.tile.'''
+	split=[]
+	for s,t in zip(w.get_shape().as_list(),tiling):
+		split+=[t,s//t]
+	return tf.reduce_mean(tf.reshape(w,split),axis=list(range(0,len(split),2)))
+
 class Residual_sign(Layer):
     def __init__(self, levels=1,trainable=True,**kwargs):
         self.levels=levels
@@ -49,13 +157,13 @@ class Residual_sign(Layer):
                 out=binarize(resid)*abs(self.means[l])
                 out_bin=out_bin+out
                 resid=resid-out
-        elif self.levels==2:
-            out=binarize(resid)*abs(self.means[0])
-            out_bin=out
-            resid=resid-out
-            out=binarize(resid)*abs(self.means[1])
-            out_bin=tf.stack([out_bin,out]) # Add one extra dimension to activations: binary levels
-            resid=resid-out
+        else:
+            out_bin=[]
+            for l in range(self.levels):
+                out=binarize(resid)*abs(self.means[l])
+                out_bin.append(out)
+                resid=resid-out
+            out_bin=tf.stack(out_bin) # Add one extra dimension to activations: binary levels
                 
         return out_bin
 
@@ -87,7 +195,7 @@ class Residual_sign(Layer):
         sess.run(self.means.assign(means))
 
 class binary_conv(Layer):
-	def __init__(self,nfilters,ch_in,k,padding,strides=(1,1),levels=1,pruning_prob=0,first_layer=False,LUT=True,BINARY=True,TM=1,TN=1,**kwargs):
+	def __init__(self,nfilters,ch_in,k,padding,strides=(1,1),levels=1,pruning_prob=0,first_layer=False,LUT=True,BINARY=True,TRC=1,TM=1,TN=1,LUT_K=5,LUT_N=1,lut_impl='batched',im2col_budget=None,recompute=False,tile_reg=0,**kwargs):
 		self.nfilters=nfilters
 		self.ch_in=ch_in
 		self.k=k
@@ -102,37 +210,35 @@ class binary_conv(Layer):
 		self.LUT=LUT # bool flag for whether to train with LUTNet architecture
 		self.BINARY=BINARY # bool flag for, if LUT==True, whether to train with binary weights
 		self.window_size=self.ch_in*self.k*self.k # size of the input activation sliding window
+		self.TRC = TRC # tiling factor wrt kernel rows and columns
 		self.TM = TM # tiling factor wrt input channels
 		self.TN = TN # tiling factor wrt output cnannels
-		self.tile_size=[self.k,self.k,self.ch_in/self.TM,self.nfilters/self.TN]
+		self.tile_size=[self.k/self.TRC,self.k/self.TRC,self.ch_in/self.TM,self.nfilters/self.TN]
+		self.LUT_K=LUT_K # number of inputs per LUT
+		self.LUT_N=LUT_N # number of LUT inputs sourced from BRAM (weights), the remaining K-N are input activations
+		self.lut_impl=lut_impl # LUT expansion implementation: 'batched' (single contraction over the truth table), 'unrolled' (one K.dot per activation minterm) or 'onehot' (LUT contents gathered at the minterm addressed by the input signs)
+		self.im2col_budget=im2col_budget # bytes of LUT im2col/minterm intermediates per example to materialise at once: the output is computed in bands of rows that fit. None expands the whole feature map at once
+		self.recompute=recompute # bool flag for recomputing the LUT expansion in the backward pass instead of keeping its intermediates
+		self.tile_reg=tile_reg # coefficient of the L2 loss on the tile-averaged weights, 0 for none
 		super(binary_conv,self).__init__(**kwargs)
 	def build(self, input_shape):
 
-		self.rand_map_0 = self.add_weight(name='rand_map_0', 
-			shape=(self.tile_size[0]*self.tile_size[1]*self.tile_size[2], 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.tile_size[0]*self.tile_size[1]*self.tile_size[2], size=[self.tile_size[0]*self.tile_size[1]*self.tile_size[2], 1])),
-			trainable=False) # Randomisation map for 2nd input connections
-		self.rand_map_1 = self.add_weight(name='rand_map_1', 
-			shape=(self.tile_size[0]*self.tile_size[1]*self.tile_size[2], 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.tile_size[0]*self.tile_size[1]*self.tile_size[2], size=[self.tile_size[0]*self.tile_size[1]*self.tile_size[2], 1])),
-			trainable=False) # Randomisation map for 3rd input connections
-		self.rand_map_2 = self.add_weight(name='rand_map_2', 
-			shape=(self.tile_size[0]*self.tile_size[1]*self.tile_size[2], 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.tile_size[0]*self.tile_size[1]*self.tile_size[2], size=[self.tile_size[0]*self.tile_size[1]*self.tile_size[2], 1])),
-			trainable=False) # Randomisation map for 4th input connections
-
-		self.rand_map_exp_0 = self.add_weight(name='rand_map_exp_0', 
-			shape=(self.window_size, 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.window_size, size=[self.window_size, 1])),
-			trainable=False) # 1st randomisation map unrolled
-		self.rand_map_exp_1 = self.add_weight(name='rand_map_exp_1', 
-			shape=(self.window_size, 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.window_size, size=[self.window_size, 1])),
-			trainable=False) # 2nd randomisation map unrolled
-		self.rand_map_exp_2 = self.add_weight(name='rand_map_exp_2', 
-			shape=(self.window_size, 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.window_size, size=[self.window_size, 1])),
-			trainable=False) # 3rd randomisation map unrolled
+		self.rand_map=[]
+		self.rand_map_exp=[]
+		for i in range(self.LUT_K-self.LUT_N-1):
+			self.rand_map.append(self.add_weight(name='rand_map_%d'%i, 
+				shape=(self.tile_size[0]*self.tile_size[1]*self.tile_size[2], 1),
+				initializer=keras.initializers.Constant(value=np.random.randint(self.tile_size[0]*self.tile_size[1]*self.tile_size[2], size=[self.tile_size[0]*self.tile_size[1]*self.tile_size[2], 1])),
+				trainable=False)) # Randomisation map for (i+2)th input connections
+		for i in range(self.LUT_K-self.LUT_N-1):
+			self.rand_map_exp.append(self.add_weight(name='rand_map_exp_%d'%i, 
+				shape=(self.window_size, 1),
+				initializer=keras.initializers.Constant(value=np.random.randint(self.window_size, size=[self.window_size, 1])),
+				trainable=False)) # ith randomisation map unrolled
+		if self.rand_map_exp:
+			self.rand_map_idx=tf.reshape(tf.cast(tf.concat(self.rand_map_exp,0),tf.int32),[-1]) # all randomisation maps as one int32 gather index
+		else:
+			self.rand_map_idx=None
 
 		stdv=1/np.sqrt(self.k*self.k*self.ch_in)
 		self.gamma=K.variable(1.0)
@@ -141,82 +247,19 @@ class binary_conv(Layer):
 			w = np.random.normal(loc=0.0, scale=stdv,size=[self.k,self.k,self.ch_in,self.nfilters]).astype(np.float32)
 			self.w=K.variable(w)
 			self.trainable_weights=[self.w,self.gamma]
-		elif self.levels==2:
+		else:
 			if self.LUT==True:
 
-				# w: BRAM contents
-				# c: LUT binary masks
-				w1  = np.random.normal(loc=0.0, scale=stdv,size=[self.k,self.k,self.ch_in,self.nfilters]).astype(np.float32)
-				c1  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c2  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c3  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c4  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c5  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c6  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c7  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c8  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c9  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c10 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c11 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c12 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c13 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c14 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c15 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c16 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c17 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c18 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c19 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c20 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c21 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c22 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c23 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c24 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c25 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c26 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c27 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c28 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c29 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c30 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c31 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c32 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				
-				self.c1 =K.variable(c1)
-				self.c2 =K.variable(c2)
-				self.c3 =K.variable(c3)
-				self.c4 =K.variable(c4)
-				self.c5 =K.variable(c5)
-				self.c6 =K.variable(c6)
-				self.c7 =K.variable(c7)
-				self.c8 =K.variable(c8)
-				self.c9 =K.variable(c9)
-				self.c10=K.variable(c10)
-				self.c11=K.variable(c11)
-				self.c12=K.variable(c12)
-				self.c13=K.variable(c13)
-				self.c14=K.variable(c14)
-				self.c15=K.variable(c15)
-				self.c16=K.variable(c16)
-				self.c17=K.variable(c17)
-				self.c18=K.variable(c18)
-				self.c19=K.variable(c19)
-				self.c20=K.variable(c20)
-				self.c21=K.variable(c21)
-				self.c22=K.variable(c22)
-				self.c23=K.variable(c23)
-				self.c24=K.variable(c24)
-				self.c25=K.variable(c25)
-				self.c26=K.variable(c26)
-				self.c27=K.variable(c27)
-				self.c28=K.variable(c28)
-				self.c29=K.variable(c29)
-				self.c30=K.variable(c30)
-				self.c31=K.variable(c31)
-				self.c32=K.variable(c32)
-				self.w1 =K.variable(w1)
-
-				self.trainable_weights=[self.c1,self.c2,self.c3,self.c4,self.c5,self.c6,self.c7,self.c8,self.c9,self.c10,self.c11,self.c12,self.c13,self.c14,self.c15,self.c16,
-					self.c17,self.c18,self.c19,self.c20,self.c21,self.c22,self.c23,self.c24,self.c25,self.c26,self.c27,self.c28,self.c29,self.c30,self.c31,self.c32,
-					self.w1,self.gamma]
+				# w: BRAM contents, one per BRAM-sourced LUT input
+				# c: LUT binary masks, stacked into one truth table of 2^K entries
+				c = np.random.normal(loc=0.0, scale=stdv,size=[2**self.LUT_K]+self.tile_size).astype(np.float32)
+				self.c=K.variable(c,name='c')
+				self.bram_w=[]
+				for i in range(self.LUT_N):
+					w = np.random.normal(loc=0.0, scale=stdv,size=[self.k,self.k,self.ch_in,self.nfilters]).astype(np.float32)
+					self.bram_w.append(K.variable(w))
+
+				self.trainable_weights=[self.c]+self.bram_w+[self.gamma]
 
 			else:
 				w = np.random.normal(loc=0.0, scale=stdv,size=[self.k,self.k,self.ch_in,self.nfilters]).astype(np.float32)
@@ -228,6 +271,10 @@ class binary_conv(Layer):
 			initializer=keras.initializers.Constant(value=np.ones((self.tile_size[0]*self.tile_size[1]*self.tile_size[2],self.tile_size[3]))),
 			trainable=False) # LUT pruning mask
 
+		if self.tile_reg and not self.first_layer: # draws the weight tiles together, so that they can later share LUTs
+			for w in (self.bram_w if self.LUT and self.levels>1 else [self.w]):
+				self.add_loss(self.tile_reg*tf.nn.l2_loss(tile_mean(w,[self.TRC,self.TRC,self.TM,self.TN])))
+
 
 
 
@@ -239,81 +286,14 @@ class binary_conv(Layer):
 				self.clamped_w=constraint_gamma*K.clip(self.w,-1,1)
 			else:
 				self.clamped_w=constraint_gamma*binarize(self.w)
-		elif self.levels==2:
+		else:
 			if self.LUT==True:
 				if self.BINARY==False:
-					self.clamped_w1 =K.clip(self.w1,-1,1) # w is not affacted by tiling
-
-					self.clamped_c1 =constraint_gamma*K.clip(tf.tile(self.c1,  [1,1,self.TM,self.TN]),-1,1) # when trained, c is tiled and therefore shared by multiple tiles of input activations
-					self.clamped_c2 =constraint_gamma*K.clip(tf.tile(self.c2,  [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c3 =constraint_gamma*K.clip(tf.tile(self.c3,  [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c4 =constraint_gamma*K.clip(tf.tile(self.c4,  [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c5 =constraint_gamma*K.clip(tf.tile(self.c5,  [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c6 =constraint_gamma*K.clip(tf.tile(self.c6,  [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c7 =constraint_gamma*K.clip(tf.tile(self.c7,  [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c8 =constraint_gamma*K.clip(tf.tile(self.c8,  [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c9 =constraint_gamma*K.clip(tf.tile(self.c9,  [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c10=constraint_gamma*K.clip(tf.tile(self.c10, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c11=constraint_gamma*K.clip(tf.tile(self.c11, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c12=constraint_gamma*K.clip(tf.tile(self.c12, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c13=constraint_gamma*K.clip(tf.tile(self.c13, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c14=constraint_gamma*K.clip(tf.tile(self.c14, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c15=constraint_gamma*K.clip(tf.tile(self.c15, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c16=constraint_gamma*K.clip(tf.tile(self.c16, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c17=constraint_gamma*K.clip(tf.tile(self.c17, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c18=constraint_gamma*K.clip(tf.tile(self.c18, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c19=constraint_gamma*K.clip(tf.tile(self.c19, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c20=constraint_gamma*K.clip(tf.tile(self.c20, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c21=constraint_gamma*K.clip(tf.tile(self.c21, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c22=constraint_gamma*K.clip(tf.tile(self.c22, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c23=constraint_gamma*K.clip(tf.tile(self.c23, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c24=constraint_gamma*K.clip(tf.tile(self.c24, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c25=constraint_gamma*K.clip(tf.tile(self.c25, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c26=constraint_gamma*K.clip(tf.tile(self.c26, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c27=constraint_gamma*K.clip(tf.tile(self.c27, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c28=constraint_gamma*K.clip(tf.tile(self.c28, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c29=constraint_gamma*K.clip(tf.tile(self.c29, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c30=constraint_gamma*K.clip(tf.tile(self.c30, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c31=constraint_gamma*K.clip(tf.tile(self.c31, [1,1,self.TM,self.TN]),-1,1)
-					self.clamped_c32=constraint_gamma*K.clip(tf.tile(self.c32, [1,1,self.TM,self.TN]),-1,1)
-
+					self.clamped_w=[K.clip(w,-1,1) for w in self.bram_w] # w is not affacted by tiling
+					self.clamped_c=constraint_gamma*K.clip(self.c,-1,1)
 				else:
-
-					self.clamped_w1 =binarize(self.w1)
-
-					self.clamped_c1 =constraint_gamma*binarize(tf.tile(self.c1, [1,1,self.TM,self.TN]))
-					self.clamped_c2 =constraint_gamma*binarize(tf.tile(self.c2, [1,1,self.TM,self.TN]))
-					self.clamped_c3 =constraint_gamma*binarize(tf.tile(self.c3, [1,1,self.TM,self.TN]))
-					self.clamped_c4 =constraint_gamma*binarize(tf.tile(self.c4, [1,1,self.TM,self.TN]))
-					self.clamped_c5 =constraint_gamma*binarize(tf.tile(self.c5, [1,1,self.TM,self.TN]))
-					self.clamped_c6 =constraint_gamma*binarize(tf.tile(self.c6, [1,1,self.TM,self.TN]))
-					self.clamped_c7 =constraint_gamma*binarize(tf.tile(self.c7, [1,1,self.TM,self.TN]))
-					self.clamped_c8 =constraint_gamma*binarize(tf.tile(self.c8, [1,1,self.TM,self.TN]))
-					self.clamped_c9 =constraint_gamma*binarize(tf.tile(self.c9, [1,1,self.TM,self.TN]))
-					self.clamped_c10=constraint_gamma*binarize(tf.tile(self.c10,[1,1,self.TM,self.TN]))
-					self.clamped_c11=constraint_gamma*binarize(tf.tile(self.c11,[1,1,self.TM,self.TN]))
-					self.clamped_c12=constraint_gamma*binarize(tf.tile(self.c12,[1,1,self.TM,self.TN]))
-					self.clamped_c13=constraint_gamma*binarize(tf.tile(self.c13,[1,1,self.TM,self.TN]))
-					self.clamped_c14=constraint_gamma*binarize(tf.tile(self.c14,[1,1,self.TM,self.TN]))
-					self.clamped_c15=constraint_gamma*binarize(tf.tile(self.c15,[1,1,self.TM,self.TN]))
-					self.clamped_c16=constraint_gamma*binarize(tf.tile(self.c16,[1,1,self.TM,self.TN]))
-					self.clamped_c17=constraint_gamma*binarize(tf.tile(self.c17,[1,1,self.TM,self.TN]))
-					self.clamped_c18=constraint_gamma*binarize(tf.tile(self.c18,[1,1,self.TM,self.TN]))
-					self.clamped_c19=constraint_gamma*binarize(tf.tile(self.c19,[1,1,self.TM,self.TN]))
-					self.clamped_c20=constraint_gamma*binarize(tf.tile(self.c20,[1,1,self.TM,self.TN]))
-					self.clamped_c21=constraint_gamma*binarize(tf.tile(self.c21,[1,1,self.TM,self.TN]))
-					self.clamped_c22=constraint_gamma*binarize(tf.tile(self.c22,[1,1,self.TM,self.TN]))
-					self.clamped_c23=constraint_gamma*binarize(tf.tile(self.c23,[1,1,self.TM,self.TN]))
-					self.clamped_c24=constraint_gamma*binarize(tf.tile(self.c24,[1,1,self.TM,self.TN]))
-					self.clamped_c25=constraint_gamma*binarize(tf.tile(self.c25,[1,1,self.TM,self.TN]))
-					self.clamped_c26=constraint_gamma*binarize(tf.tile(self.c26,[1,1,self.TM,self.TN]))
-					self.clamped_c27=constraint_gamma*binarize(tf.tile(self.c27,[1,1,self.TM,self.TN]))
-					self.clamped_c28=constraint_gamma*binarize(tf.tile(self.c28,[1,1,self.TM,self.TN]))
-					self.clamped_c29=constraint_gamma*binarize(tf.tile(self.c29,[1,1,self.TM,self.TN]))
-					self.clamped_c30=constraint_gamma*binarize(tf.tile(self.c30,[1,1,self.TM,self.TN]))
-					self.clamped_c31=constraint_gamma*binarize(tf.tile(self.c31,[1,1,self.TM,self.TN]))
-					self.clamped_c32=constraint_gamma*binarize(tf.tile(self.c32,[1,1,self.TM,self.TN]))
-
+					self.clamped_w=[binarize(w) for w in self.bram_w]
+					self.clamped_c=constraint_gamma*binarize(self.c)
 			else:
 				if self.BINARY==False:
 					self.clamped_w=constraint_gamma*K.clip(self.w,-1,1)
@@ -323,136 +303,83 @@ class binary_conv(Layer):
 		if keras.__version__[0]=='2':
 
 			if self.levels==1 or self.first_layer==True:
-				self.out=K.conv2d(x, kernel=self.clamped_w*tf.tile(tf.reshape(self.pruning_mask, self.tile_size), [1,1,self.TM,self.TN]), padding=self.padding,strides=self.strides )
-			elif self.levels==2:
+				self.out=K.conv2d(x, kernel=self.clamped_w*tf.tile(tf.reshape(self.pruning_mask, self.tile_size), [self.TRC,self.TRC,self.TM,self.TN]), padding=self.padding,strides=self.strides )
+			else:
 				if self.LUT==True: # LUTNet
-					x0_patches = tf.extract_image_patches(x[0,:,:,:,:],
-						[1, self.k, self.k, 1],
-						[1, self.strides[0], self.strides[1], 1], [1, 1, 1, 1],
-						padding=self.PADDING) # conv dissected into im2col + dotproduct, such that windows of input actications are unrolled and randomisation is constrained within respective windows
-					x1_patches = tf.extract_image_patches(x[1,:,:,:,:],
-						[1, self.k, self.k, 1],
-						[1, self.strides[0], self.strides[1], 1], [1, 1, 1, 1],
-						padding=self.PADDING)
-
-					# Special hack for randomising the subsequent input connections: tensorflow does not support advanced matrix indexing
-					x0_shuf_patches=tf.transpose(x0_patches, perm=[3, 0, 1, 2])
-					x0_shuf_patches_0 = tf.gather_nd(x0_shuf_patches, tf.cast(self.rand_map_exp_0, tf.int32))
-					x0_shuf_patches_0=tf.transpose(x0_shuf_patches_0, perm=[1, 2, 3, 0])
-					x0_shuf_patches_1 = tf.gather_nd(x0_shuf_patches, tf.cast(self.rand_map_exp_1, tf.int32))
-					x0_shuf_patches_1=tf.transpose(x0_shuf_patches_1, perm=[1, 2, 3, 0])
-					x0_shuf_patches_2 = tf.gather_nd(x0_shuf_patches, tf.cast(self.rand_map_exp_2, tf.int32))
-					x0_shuf_patches_2=tf.transpose(x0_shuf_patches_2, perm=[1, 2, 3, 0])
-				
-					x1_shuf_patches=tf.transpose(x1_patches, perm=[3, 0, 1, 2])
-					x1_shuf_patches_0 = tf.gather_nd(x1_shuf_patches, tf.cast(self.rand_map_exp_0, tf.int32))
-					x1_shuf_patches_0=tf.transpose(x1_shuf_patches_0, perm=[1, 2, 3, 0])
-					x1_shuf_patches_1 = tf.gather_nd(x1_shuf_patches, tf.cast(self.rand_map_exp_1, tf.int32))
-					x1_shuf_patches_1=tf.transpose(x1_shuf_patches_1, perm=[1, 2, 3, 0])
-					x1_shuf_patches_2 = tf.gather_nd(x1_shuf_patches, tf.cast(self.rand_map_exp_2, tf.int32))
-					x1_shuf_patches_2=tf.transpose(x1_shuf_patches_2, perm=[1, 2, 3, 0])
-					
-					# Lagrangian interpolating polynomial
-					x0_pos=(1+binarize(x0_patches))/2*abs(x0_patches) # abs(xi_patches) is trainable scaling factor for ith binary level, which is multiplied by once only per dot product
-					x0_neg=(1-binarize(x0_patches))/2*abs(x0_patches)
-					x1_pos=(1+binarize(x1_patches))/2*abs(x1_patches)
-					x1_neg=(1-binarize(x1_patches))/2*abs(x1_patches)
-					x0s0_pos=(1+binarize(x0_shuf_patches_0))/2
-					x0s0_neg=(1-binarize(x0_shuf_patches_0))/2
-					x1s0_pos=(1+binarize(x1_shuf_patches_0))/2
-					x1s0_neg=(1-binarize(x1_shuf_patches_0))/2
-					x0s1_pos=(1+binarize(x0_shuf_patches_1))/2
-					x0s1_neg=(1-binarize(x0_shuf_patches_1))/2
-					x1s1_pos=(1+binarize(x1_shuf_patches_1))/2
-					x1s1_neg=(1-binarize(x1_shuf_patches_1))/2
-					x0s2_pos=(1+binarize(x0_shuf_patches_2))/2
-					x0s2_neg=(1-binarize(x0_shuf_patches_2))/2
-					x1s2_pos=(1+binarize(x1_shuf_patches_2))/2
-					x1s2_neg=(1-binarize(x1_shuf_patches_2))/2
-				
-					ws0_pos=(1+binarize(self.clamped_w1))/2
-					ws0_neg=(1-binarize(self.clamped_w1))/2
-
-					self.out=         K.dot(x0_pos*x0s0_pos*x0s1_pos*x0s2_pos, tf.reshape(self.clamped_c1 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_pos*x0s1_pos*x0s2_pos, tf.reshape(self.clamped_c2 *ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_pos*x0s1_pos*x0s2_neg, tf.reshape(self.clamped_c3 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_pos*x0s1_pos*x0s2_neg, tf.reshape(self.clamped_c4 *ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_pos*x0s1_neg*x0s2_pos, tf.reshape(self.clamped_c5 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_pos*x0s1_neg*x0s2_pos, tf.reshape(self.clamped_c6 *ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_pos*x0s1_neg*x0s2_neg, tf.reshape(self.clamped_c7 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_pos*x0s1_neg*x0s2_neg, tf.reshape(self.clamped_c8 *ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_neg*x0s1_pos*x0s2_pos, tf.reshape(self.clamped_c9 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_neg*x0s1_pos*x0s2_pos, tf.reshape(self.clamped_c10*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_neg*x0s1_pos*x0s2_neg, tf.reshape(self.clamped_c11*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_neg*x0s1_pos*x0s2_neg, tf.reshape(self.clamped_c12*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_neg*x0s1_neg*x0s2_pos, tf.reshape(self.clamped_c13*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_neg*x0s1_neg*x0s2_pos, tf.reshape(self.clamped_c14*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_neg*x0s1_neg*x0s2_neg, tf.reshape(self.clamped_c15*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_pos*x0s0_neg*x0s1_neg*x0s2_neg, tf.reshape(self.clamped_c16*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_pos*x0s1_pos*x0s2_pos, tf.reshape(self.clamped_c17*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_pos*x0s1_pos*x0s2_pos, tf.reshape(self.clamped_c18*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_pos*x0s1_pos*x0s2_neg, tf.reshape(self.clamped_c19*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_pos*x0s1_pos*x0s2_neg, tf.reshape(self.clamped_c20*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_pos*x0s1_neg*x0s2_pos, tf.reshape(self.clamped_c21*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_pos*x0s1_neg*x0s2_pos, tf.reshape(self.clamped_c22*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_pos*x0s1_neg*x0s2_neg, tf.reshape(self.clamped_c23*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_pos*x0s1_neg*x0s2_neg, tf.reshape(self.clamped_c24*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_neg*x0s1_pos*x0s2_pos, tf.reshape(self.clamped_c25*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_neg*x0s1_pos*x0s2_pos, tf.reshape(self.clamped_c26*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_neg*x0s1_pos*x0s2_neg, tf.reshape(self.clamped_c27*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_neg*x0s1_pos*x0s2_neg, tf.reshape(self.clamped_c28*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_neg*x0s1_neg*x0s2_pos, tf.reshape(self.clamped_c29*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_neg*x0s1_neg*x0s2_pos, tf.reshape(self.clamped_c30*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_neg*x0s1_neg*x0s2_neg, tf.reshape(self.clamped_c31*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x0_neg*x0s0_neg*x0s1_neg*x0s2_neg, tf.reshape(self.clamped_c32*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_pos*x1s1_pos*x1s2_pos, tf.reshape(self.clamped_c1 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_pos*x1s1_pos*x1s2_pos, tf.reshape(self.clamped_c2 *ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_pos*x1s1_pos*x1s2_neg, tf.reshape(self.clamped_c3 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_pos*x1s1_pos*x1s2_neg, tf.reshape(self.clamped_c4 *ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_pos*x1s1_neg*x1s2_pos, tf.reshape(self.clamped_c5 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_pos*x1s1_neg*x1s2_pos, tf.reshape(self.clamped_c6 *ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_pos*x1s1_neg*x1s2_neg, tf.reshape(self.clamped_c7 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_pos*x1s1_neg*x1s2_neg, tf.reshape(self.clamped_c8 *ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_neg*x1s1_pos*x1s2_pos, tf.reshape(self.clamped_c9 *ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_neg*x1s1_pos*x1s2_pos, tf.reshape(self.clamped_c10*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_neg*x1s1_pos*x1s2_neg, tf.reshape(self.clamped_c11*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_neg*x1s1_pos*x1s2_neg, tf.reshape(self.clamped_c12*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_neg*x1s1_neg*x1s2_pos, tf.reshape(self.clamped_c13*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_neg*x1s1_neg*x1s2_pos, tf.reshape(self.clamped_c14*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_neg*x1s1_neg*x1s2_neg, tf.reshape(self.clamped_c15*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_pos*x1s0_neg*x1s1_neg*x1s2_neg, tf.reshape(self.clamped_c16*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_pos*x1s1_pos*x1s2_pos, tf.reshape(self.clamped_c17*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_pos*x1s1_pos*x1s2_pos, tf.reshape(self.clamped_c18*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_pos*x1s1_pos*x1s2_neg, tf.reshape(self.clamped_c19*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_pos*x1s1_pos*x1s2_neg, tf.reshape(self.clamped_c20*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_pos*x1s1_neg*x1s2_pos, tf.reshape(self.clamped_c21*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_pos*x1s1_neg*x1s2_pos, tf.reshape(self.clamped_c22*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_pos*x1s1_neg*x1s2_neg, tf.reshape(self.clamped_c23*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_pos*x1s1_neg*x1s2_neg, tf.reshape(self.clamped_c24*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_neg*x1s1_pos*x1s2_pos, tf.reshape(self.clamped_c25*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_neg*x1s1_pos*x1s2_pos, tf.reshape(self.clamped_c26*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_neg*x1s1_pos*x1s2_neg, tf.reshape(self.clamped_c27*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_neg*x1s1_pos*x1s2_neg, tf.reshape(self.clamped_c28*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_neg*x1s1_neg*x1s2_pos, tf.reshape(self.clamped_c29*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_neg*x1s1_neg*x1s2_pos, tf.reshape(self.clamped_c30*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_neg*x1s1_neg*x1s2_neg, tf.reshape(self.clamped_c31*ws0_pos*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
-					self.out=self.out+K.dot(x1_neg*x1s0_neg*x1s1_neg*x1s2_neg, tf.reshape(self.clamped_c32*ws0_neg*tf.tile(tf.reshape(self.pruning_mask,self.tile_size),[1,1,self.TM,self.TN]), [-1, self.nfilters]))
+					# effective LUT weights, built once per step: c is pruned at tile size, then tiled and therefore shared by multiple tiles of input activations
+					lut_c=tf.tile(self.clamped_c*tf.reshape(self.pruning_mask,[1]+self.tile_size),[1,self.TRC,self.TRC,self.TM,self.TN])
+					ws=[tf.reshape(binarize(w),[-1,self.nfilters]) for w in self.clamped_w]
+					lut_w=lut_weights(tf.reshape(lut_c,[2**self.LUT_K,-1,self.nfilters]),[(1+b)/2 for b in ws],[(1-b)/2 for b in ws])
+
+					if self.im2col_budget is None:
+						self.out=self.lut_conv(x,self.PADDING,lut_w)
+					else:
+						self.out=self.lut_bands(x,lut_w)
 
 				else: # normal BNN
 					x_expanded=0
 					for l in range(self.levels):
 						x_in=x[l,:,:,:,:]
 						x_expanded=x_expanded+x_in
-					self.out=K.conv2d(x_expanded, kernel=self.clamped_w*tf.tile(tf.reshape(self.pruning_mask, self.tile_size),[1,1,self.TM,self.TN]), padding=self.padding,strides=self.strides )
+					self.out=K.conv2d(x_expanded, kernel=self.clamped_w*tf.tile(tf.reshape(self.pruning_mask, self.tile_size),[self.TRC,self.TRC,self.TM,self.TN]), padding=self.padding,strides=self.strides )
 		self.output_dim=self.out.get_shape()
 		return self.out
+	def lut_band(self,x,padding,lut_w):
+		'''LUTNet convolution of the [levels,batch,rows,cols,ch_in] activations x with the effective LUT weights lut_w.'''
+		x_m=0
+		out=0
+		for l in range(self.levels):
+			patches=tf.extract_image_patches(x[l,:,:,:,:],
+				[1, self.k, self.k, 1],
+				[1, self.strides[0], self.strides[1], 1], [1, 1, 1, 1],
+				padding=padding) # conv dissected into im2col + dotproduct, such that windows of input actications are unrolled and randomisation is constrained within respective windows
+			out_shape=patches.get_shape().as_list()[1:3]
+			patches=tf.reshape(patches,[-1,self.window_size])
+
+			shuf=lut_shuffle(patches,self.rand_map_idx,len(self.rand_map_exp)) # randomised subsequent input connections
+
+			if self.lut_impl=='onehot': # LUT contents gathered at the minterm addressed by the input signs, see lut_gather
+				out=out+lut_gather(patches,shuf,lut_w)
+			else:
+				x_m=x_m+lut_minterms(*lut_selectors(patches,shuf),axis=1) # binary levels share the same LUTs, so their minterms are summed before the dot product
+
+		if self.lut_impl=='unrolled':
+			for i in range(2**(self.LUT_K-self.LUT_N)):
+				out=out+K.dot(x_m[:,i,:],lut_w[i])
+		elif self.lut_impl!='onehot': # whole truth table contracted in one matmul
+			out=lut_contract(x_m,lut_w)
+		out=tf.reshape(out,[-1]+out_shape+[self.nfilters])
+		return out
+	def lut_bands(self,x,lut_w):
+		'''As lut_band over the whole feature map, computed one band of output rows at a time to stay within im2col_budget.'''
+		h,w=x.get_shape().as_list()[2:4]
+		if self.PADDING=="SAME": # pad explicitly, so that every band is extracted with VALID padding
+			oh,ow=-(-h//self.strides[0]),-(-w//self.strides[1])
+			ph=max((oh-1)*self.strides[0]+self.k-h,0)
+			pw=max((ow-1)*self.strides[1]+self.k-w,0)
+			x=tf.pad(x,[[0,0],[0,0],[ph//2,ph-ph//2],[pw//2,pw-pw//2],[0,0]])
+		else:
+			oh,ow=(h-self.k)//self.strides[0]+1,(w-self.k)//self.strides[1]+1
+		pixel_bytes=4*self.levels*self.window_size*(2**(self.LUT_K-self.LUT_N+1)+3*(self.LUT_K-self.LUT_N)) # patches, shuffled inputs, selectors and minterms of one output pixel
+		rows=max(1,int(self.im2col_budget//(ow*pixel_bytes)))
+		bands=[]
+		for r in range(0,oh,rows):
+			with tf.control_dependencies(bands[-1:]): # one band at a time, so that the intermediates of the previous band can be freed
+				band=x[:,:,r*self.strides[0]:(min(r+rows,oh)-1)*self.strides[0]+self.k,:,:]
+				bands.append(self.lut_conv(band,"VALID",lut_w))
+		return tf.concat(bands,axis=1)
+	def lut_conv(self,x,padding,lut_w):
+		'''lut_band, with only x and lut_w kept for backprop if recompute is set.'''
+		if self.recompute:
+			return lut_recompute(lambda x,lut_w: self.lut_band(x,padding,lut_w),x,lut_w)
+		return self.lut_band(x,padding,lut_w)
 	def  get_output_shape_for(self,input_shape):
 		return (input_shape[0], self.output_dim[1],self.output_dim[2],self.output_dim[3])
 	def compute_output_shape(self,input_shape):
 		return (input_shape[0], self.output_dim[1],self.output_dim[2],self.output_dim[3])
 
 class binary_dense(Layer):
-	def __init__(self,n_in,n_out,levels=1,pruning_prob=0,first_layer=False,LUT=True,BINARY=True,TM=1,TN=1,**kwargs):
+	def __init__(self,n_in,n_out,levels=1,pruning_prob=0,first_layer=False,LUT=True,BINARY=True,TM=1,TN=1,LUT_K=5,LUT_N=1,lut_impl='batched',recompute=False,tile_reg=0,**kwargs):
 		self.n_in=n_in
 		self.n_out=n_out
 		self.levels=levels # number of binary levels
@@ -462,33 +389,29 @@ class binary_dense(Layer):
 		self.TM = TM # tiling factor wrt input channels
 		self.TN = TN # tiling factor wrt output cnannels
 		self.tile_size = [n_in/TM, n_out/TN]
+		self.LUT_K=LUT_K # number of inputs per LUT
+		self.LUT_N=LUT_N # number of LUT inputs sourced from BRAM (weights), the remaining K-N are input activations
+		self.lut_impl=lut_impl # LUT expansion implementation: 'batched' (single contraction over the truth table), 'unrolled' (one K.dot per activation minterm) or 'onehot' (LUT contents gathered at the minterm addressed by the input signs)
+		self.recompute=recompute # bool flag for recomputing the LUT expansion in the backward pass instead of keeping its intermediates
+		self.tile_reg=tile_reg # coefficient of the L2 loss on the tile-averaged weights, 0 for none
 		super(binary_dense,self).__init__(**kwargs)
 	def build(self, input_shape):
-		self.rand_map_0 = self.add_weight(name='rand_map_0', 
-			shape=(self.tile_size[0], 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.tile_size[0], size=[self.tile_size[0], 1])),
-			trainable=False) # Randomisation map for 2nd input connections
-		self.rand_map_1 = self.add_weight(name='rand_map_1', 
-			shape=(self.tile_size[0], 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.tile_size[0], size=[self.tile_size[0], 1])),
-			trainable=False) # Randomisation map for 3rd input connections
-		self.rand_map_2 = self.add_weight(name='rand_map_2', 
-			shape=(self.tile_size[0], 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.tile_size[0], size=[self.tile_size[0], 1])),
-			trainable=False) # Randomisation map for 4th input connections
-
-		self.rand_map_exp_0 = self.add_weight(name='rand_map_exp_0', 
-			shape=(self.n_in, 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.n_in, size=[self.n_in, 1])),
-			trainable=False) # 1st randomisation map unrolled
-		self.rand_map_exp_1 = self.add_weight(name='rand_map_exp_1', 
-			shape=(self.n_in, 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.n_in, size=[self.n_in, 1])),
-			trainable=False) # 2nd randomisation map unrolled
-		self.rand_map_exp_2 = self.add_weight(name='rand_map_exp_2', 
-			shape=(self.n_in, 1),
-			initializer=keras.initializers.Constant(value=np.random.randint(self.n_in, size=[self.n_in, 1])),
-			trainable=False) # 3rd randomisation map unrolled
+		self.rand_map=[]
+		self.rand_map_exp=[]
+		for i in range(self.LUT_K-self.LUT_N-1):
+			self.rand_map.append(self.add_weight(name='rand_map_%d'%i, 
+				shape=(self.tile_size[0], 1),
+				initializer=keras.initializers.Constant(value=np.random.randint(self.tile_size[0], size=[self.tile_size[0], 1])),
+				trainable=False)) # Randomisation map for (i+2)th input connections
+		for i in range(self.LUT_K-self.LUT_N-1):
+			self.rand_map_exp.append(self.add_weight(name='rand_map_exp_%d'%i, 
+				shape=(self.n_in, 1),
+				initializer=keras.initializers.Constant(value=np.random.randint(self.n_in, size=[self.n_in, 1])),
+				trainable=False)) # ith randomisation map unrolled
+		if self.rand_map_exp:
+			self.rand_map_idx=tf.reshape(tf.cast(tf.concat(self.rand_map_exp,0),tf.int32),[-1]) # all randomisation maps as one int32 gather index
+		else:
+			self.rand_map_idx=None
 
 		stdv=1/np.sqrt(self.n_in)
 		self.gamma=K.variable(1.0)
@@ -496,84 +419,19 @@ class binary_dense(Layer):
 			w = np.random.normal(loc=0.0, scale=stdv,size=[self.n_in,self.n_out]).astype(np.float32)
 			self.w=K.variable(w)
 			self.trainable_weights=[self.w,self.gamma]
-		elif self.levels==2:
+		else:
 			if self.LUT==True:
 
-				# w: BRAM contents
-				# c: LUT binary masks
-				w1  = np.random.normal(loc=0.0, scale=stdv,size=[self.n_in,self.n_out]).astype(np.float32)
-				c1  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c2  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c3  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c4  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c5  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c6  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c7  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c8  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c9  = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c10 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c11 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c12 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c13 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c14 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c15 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c16 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c17 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c18 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c19 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c20 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c21 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c22 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c23 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c24 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c25 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c26 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c27 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c28 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c29 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c30 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c31 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-				c32 = np.random.normal(loc=0.0, scale=stdv,size=self.tile_size).astype(np.float32)
-
-				self.c1 =K.variable(c1)
-				self.c2 =K.variable(c2)
-				self.c3 =K.variable(c3)
-				self.c4 =K.variable(c4)
-				self.c5 =K.variable(c5)
-				self.c6 =K.variable(c6)
-				self.c7 =K.variable(c7)
-				self.c8 =K.variable(c8)
-				self.c9 =K.variable(c9)
-				self.c10=K.variable(c10)
-				self.c11=K.variable(c11)
-				self.c12=K.variable(c12)
-				self.c13=K.variable(c13)
-				self.c14=K.variable(c14)
-				self.c15=K.variable(c15)
-				self.c16=K.variable(c16)
-				self.c17=K.variable(c17)
-				self.c18=K.variable(c18)
-				self.c19=K.variable(c19)
-				self.c20=K.variable(c20)
-				self.c21=K.variable(c21)
-				self.c22=K.variable(c22)
-				self.c23=K.variable(c23)
-				self.c24=K.variable(c24)
-				self.c25=K.variable(c25)
-				self.c26=K.variable(c26)
-				self.c27=K.variable(c27)
-				self.c28=K.variable(c28)
-				self.c29=K.variable(c29)
-				self.c30=K.variable(c30)
-				self.c31=K.variable(c31)
-				self.c32=K.variable(c32)
-				self.w1 =K.variable(w1)
-
-				self.trainable_weights=[self.c1,self.c2,self.c3,self.c4,self.c5,self.c6,self.c7,self.c8,self.c9,self.c10,self.c11,self.c12,self.c13,self.c14,self.c15,self.c16,
-					self.c17,self.c18,self.c19,self.c20,self.c21,self.c22,self.c23,self.c24,self.c25,self.c26,self.c27,self.c28,self.c29,self.c30,self.c31,self.c32,
-					self.w1,self.gamma]
-
+				# w: BRAM contents, one per BRAM-sourced LUT input
+				# c: LUT binary masks, stacked into one truth table of 2^K entries
+				c = np.random.normal(loc=0.0, scale=stdv,size=[2**self.LUT_K]+self.tile_size).astype(np.float32)
+				self.c=K.variable(c,name='c')
+				self.bram_w=[]
+				for i in range(self.LUT_N):
+					w = np.random.normal(loc=0.0, scale=stdv,size=[self.n_in,self.n_out]).astype(np.float32)
+					self.bram_w.append(K.variable(w))
 
+				self.trainable_weights=[self.c]+self.bram_w+[self.gamma]
 
 			else:
 				w = np.random.normal(loc=0.0, scale=stdv,size=[self.n_in,self.n_out]).astype(np.float32)
@@ -583,6 +441,9 @@ class binary_dense(Layer):
 			shape=self.tile_size,
 			initializer=keras.initializers.Constant(value=np.ones(self.tile_size)),
 			trainable=False) # LUT pruning mask
+		if self.tile_reg and not self.first_layer: # draws the weight tiles together, so that they can later share LUTs
+			for w in (self.bram_w if self.LUT and self.levels>1 else [self.w]):
+				self.add_loss(self.tile_reg*tf.nn.l2_loss(tile_mean(w,[self.TM,self.TN])))
 
 	def call(self, x,mask=None):
 		constraint_gamma=K.abs(self.gamma) # Gamma is the current layer's trainable scaling factor. One per layer.
@@ -592,167 +453,24 @@ class binary_dense(Layer):
 			else:
 				self.clamped_w=constraint_gamma*binarize(self.w)
 			self.out=K.dot(x,self.clamped_w)
-		elif self.levels==2:
+		else:
 			if self.LUT==True:
 				if self.BINARY==False:
-					self.clamped_w1=K.clip(self.w1,-1,1) # w is not affacted by tiling
-	
-					self.clamped_c1= constraint_gamma*K.clip(tf.tile(self.c1, [self.TM,self.TN]),-1,1) # when trained, c is tiled and therefore shared by multiple tiles of input activations
-					self.clamped_c2= constraint_gamma*K.clip(tf.tile(self.c2, [self.TM,self.TN]),-1,1)
-					self.clamped_c3= constraint_gamma*K.clip(tf.tile(self.c3, [self.TM,self.TN]),-1,1)
-					self.clamped_c4= constraint_gamma*K.clip(tf.tile(self.c4, [self.TM,self.TN]),-1,1)
-					self.clamped_c5= constraint_gamma*K.clip(tf.tile(self.c5, [self.TM,self.TN]),-1,1)
-					self.clamped_c6= constraint_gamma*K.clip(tf.tile(self.c6, [self.TM,self.TN]),-1,1)
-					self.clamped_c7= constraint_gamma*K.clip(tf.tile(self.c7, [self.TM,self.TN]),-1,1)
-					self.clamped_c8= constraint_gamma*K.clip(tf.tile(self.c8, [self.TM,self.TN]),-1,1)
-					self.clamped_c9= constraint_gamma*K.clip(tf.tile(self.c9, [self.TM,self.TN]),-1,1)
-					self.clamped_c10=constraint_gamma*K.clip(tf.tile(self.c10,[self.TM,self.TN]),-1,1)
-					self.clamped_c11=constraint_gamma*K.clip(tf.tile(self.c11,[self.TM,self.TN]),-1,1)
-					self.clamped_c12=constraint_gamma*K.clip(tf.tile(self.c12,[self.TM,self.TN]),-1,1)
-					self.clamped_c13=constraint_gamma*K.clip(tf.tile(self.c13,[self.TM,self.TN]),-1,1)
-					self.clamped_c14=constraint_gamma*K.clip(tf.tile(self.c14,[self.TM,self.TN]),-1,1)
-					self.clamped_c15=constraint_gamma*K.clip(tf.tile(self.c15,[self.TM,self.TN]),-1,1)
-					self.clamped_c16=constraint_gamma*K.clip(tf.tile(self.c16,[self.TM,self.TN]),-1,1)
-					self.clamped_c17=constraint_gamma*K.clip(tf.tile(self.c17,[self.TM,self.TN]),-1,1)
-					self.clamped_c18=constraint_gamma*K.clip(tf.tile(self.c18,[self.TM,self.TN]),-1,1)
-					self.clamped_c19=constraint_gamma*K.clip(tf.tile(self.c19,[self.TM,self.TN]),-1,1)
-					self.clamped_c20=constraint_gamma*K.clip(tf.tile(self.c20,[self.TM,self.TN]),-1,1)
-					self.clamped_c21=constraint_gamma*K.clip(tf.tile(self.c21,[self.TM,self.TN]),-1,1)
-					self.clamped_c22=constraint_gamma*K.clip(tf.tile(self.c22,[self.TM,self.TN]),-1,1)
-					self.clamped_c23=constraint_gamma*K.clip(tf.tile(self.c23,[self.TM,self.TN]),-1,1)
-					self.clamped_c24=constraint_gamma*K.clip(tf.tile(self.c24,[self.TM,self.TN]),-1,1)
-					self.clamped_c25=constraint_gamma*K.clip(tf.tile(self.c25,[self.TM,self.TN]),-1,1)
-					self.clamped_c26=constraint_gamma*K.clip(tf.tile(self.c26,[self.TM,self.TN]),-1,1)
-					self.clamped_c27=constraint_gamma*K.clip(tf.tile(self.c27,[self.TM,self.TN]),-1,1)
-					self.clamped_c28=constraint_gamma*K.clip(tf.tile(self.c28,[self.TM,self.TN]),-1,1)
-					self.clamped_c29=constraint_gamma*K.clip(tf.tile(self.c29,[self.TM,self.TN]),-1,1)
-					self.clamped_c30=constraint_gamma*K.clip(tf.tile(self.c30,[self.TM,self.TN]),-1,1)
-					self.clamped_c31=constraint_gamma*K.clip(tf.tile(self.c31,[self.TM,self.TN]),-1,1)
-					self.clamped_c32=constraint_gamma*K.clip(tf.tile(self.c32,[self.TM,self.TN]),-1,1)
+					self.clamped_w=[K.clip(w,-1,1) for w in self.bram_w] # w is not affacted by tiling
+					self.clamped_c=constraint_gamma*K.clip(self.c,-1,1)
+				else:
+					self.clamped_w=[binarize(w) for w in self.bram_w]
+					self.clamped_c=constraint_gamma*binarize(self.c)
+
+				# effective LUT weights, built once per step: c is pruned at tile size, then tiled and therefore shared by multiple tiles of input activations
+				lut_c=tf.tile(self.clamped_c*tf.expand_dims(self.pruning_mask,0),[1,self.TM,self.TN])
+				ws=[binarize(w) for w in self.clamped_w]
+				lut_w=lut_weights(lut_c,[(1+b)/2 for b in ws],[(1-b)/2 for b in ws])
 
+				if self.recompute: # only x and lut_w are kept for backprop
+					self.out=lut_recompute(self.lut_expand,x,lut_w)
 				else:
-					self.clamped_w1 =binarize(self.w1)
-	
-					self.clamped_c1= constraint_gamma*binarize(tf.tile(self.c1, [self.TM,self.TN]))
-					self.clamped_c2= constraint_gamma*binarize(tf.tile(self.c2, [self.TM,self.TN]))
-					self.clamped_c3= constraint_gamma*binarize(tf.tile(self.c3, [self.TM,self.TN]))
-					self.clamped_c4= constraint_gamma*binarize(tf.tile(self.c4, [self.TM,self.TN]))
-					self.clamped_c5= constraint_gamma*binarize(tf.tile(self.c5, [self.TM,self.TN]))
-					self.clamped_c6= constraint_gamma*binarize(tf.tile(self.c6, [self.TM,self.TN]))
-					self.clamped_c7= constraint_gamma*binarize(tf.tile(self.c7, [self.TM,self.TN]))
-					self.clamped_c8= constraint_gamma*binarize(tf.tile(self.c8, [self.TM,self.TN]))
-					self.clamped_c9= constraint_gamma*binarize(tf.tile(self.c9, [self.TM,self.TN]))
-					self.clamped_c10=constraint_gamma*binarize(tf.tile(self.c10,[self.TM,self.TN]))
-					self.clamped_c11=constraint_gamma*binarize(tf.tile(self.c11,[self.TM,self.TN]))
-					self.clamped_c12=constraint_gamma*binarize(tf.tile(self.c12,[self.TM,self.TN]))
-					self.clamped_c13=constraint_gamma*binarize(tf.tile(self.c13,[self.TM,self.TN]))
-					self.clamped_c14=constraint_gamma*binarize(tf.tile(self.c14,[self.TM,self.TN]))
-					self.clamped_c15=constraint_gamma*binarize(tf.tile(self.c15,[self.TM,self.TN]))
-					self.clamped_c16=constraint_gamma*binarize(tf.tile(self.c16,[self.TM,self.TN]))
-					self.clamped_c17=constraint_gamma*binarize(tf.tile(self.c17,[self.TM,self.TN]))
-					self.clamped_c18=constraint_gamma*binarize(tf.tile(self.c18,[self.TM,self.TN]))
-					self.clamped_c19=constraint_gamma*binarize(tf.tile(self.c19,[self.TM,self.TN]))
-					self.clamped_c20=constraint_gamma*binarize(tf.tile(self.c20,[self.TM,self.TN]))
-					self.clamped_c21=constraint_gamma*binarize(tf.tile(self.c21,[self.TM,self.TN]))
-					self.clamped_c22=constraint_gamma*binarize(tf.tile(self.c22,[self.TM,self.TN]))
-					self.clamped_c23=constraint_gamma*binarize(tf.tile(self.c23,[self.TM,self.TN]))
-					self.clamped_c24=constraint_gamma*binarize(tf.tile(self.c24,[self.TM,self.TN]))
-					self.clamped_c25=constraint_gamma*binarize(tf.tile(self.c25,[self.TM,self.TN]))
-					self.clamped_c26=constraint_gamma*binarize(tf.tile(self.c26,[self.TM,self.TN]))
-					self.clamped_c27=constraint_gamma*binarize(tf.tile(self.c27,[self.TM,self.TN]))
-					self.clamped_c28=constraint_gamma*binarize(tf.tile(self.c28,[self.TM,self.TN]))
-					self.clamped_c29=constraint_gamma*binarize(tf.tile(self.c29,[self.TM,self.TN]))
-					self.clamped_c30=constraint_gamma*binarize(tf.tile(self.c30,[self.TM,self.TN]))
-					self.clamped_c31=constraint_gamma*binarize(tf.tile(self.c31,[self.TM,self.TN]))
-					self.clamped_c32=constraint_gamma*binarize(tf.tile(self.c32,[self.TM,self.TN]))
-
-				# Special hack for randomising the subsequent input connections: tensorflow does not support advanced matrix indexing
-				shuf_x=tf.transpose(x, perm=[2, 0, 1])
-				shuf_x_0 = tf.gather_nd(shuf_x, tf.cast(self.rand_map_exp_0, tf.int32))
-				shuf_x_0=tf.transpose(shuf_x_0, perm=[1, 2, 0])
-				
-				shuf_x_1 = tf.gather_nd(shuf_x, tf.cast(self.rand_map_exp_1, tf.int32))
-				shuf_x_1=tf.transpose(shuf_x_1, perm=[1, 2, 0])
-
-				shuf_x_2 = tf.gather_nd(shuf_x, tf.cast(self.rand_map_exp_2, tf.int32))
-				shuf_x_2=tf.transpose(shuf_x_2, perm=[1, 2, 0])
-			
-				x_pos=(1+binarize(x))/2*abs(x)
-				x_neg=(1-binarize(x))/2*abs(x)
-				xs0_pos=(1+binarize(shuf_x_0))/2#*abs(shuf_x_0)
-				xs0_neg=(1-binarize(shuf_x_0))/2#*abs(shuf_x_0)
-				xs1_pos=(1+binarize(shuf_x_1))/2#*abs(shuf_x_1)
-				xs1_neg=(1-binarize(shuf_x_1))/2#*abs(shuf_x_1)
-				xs2_pos=(1+binarize(shuf_x_2))/2#*abs(shuf_x_2)
-				xs2_neg=(1-binarize(shuf_x_2))/2#*abs(shuf_x_2)
-
-				ws0_pos=(1+binarize(self.clamped_w1))/2
-				ws0_neg=(1-binarize(self.clamped_w1))/2
-
-				self.out=         K.dot(x_pos[0,:,:]*xs0_pos[0,:,:]*xs1_pos[0,:,:]*xs2_pos[0,:,:],self.clamped_c1 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_pos[0,:,:]*xs1_pos[0,:,:]*xs2_pos[0,:,:],self.clamped_c2 *ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_pos[0,:,:]*xs1_pos[0,:,:]*xs2_neg[0,:,:],self.clamped_c3 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_pos[0,:,:]*xs1_pos[0,:,:]*xs2_neg[0,:,:],self.clamped_c4 *ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_pos[0,:,:]*xs1_neg[0,:,:]*xs2_pos[0,:,:],self.clamped_c5 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_pos[0,:,:]*xs1_neg[0,:,:]*xs2_pos[0,:,:],self.clamped_c6 *ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_pos[0,:,:]*xs1_neg[0,:,:]*xs2_neg[0,:,:],self.clamped_c7 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_pos[0,:,:]*xs1_neg[0,:,:]*xs2_neg[0,:,:],self.clamped_c8 *ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_neg[0,:,:]*xs1_pos[0,:,:]*xs2_pos[0,:,:],self.clamped_c9 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_neg[0,:,:]*xs1_pos[0,:,:]*xs2_pos[0,:,:],self.clamped_c10*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_neg[0,:,:]*xs1_pos[0,:,:]*xs2_neg[0,:,:],self.clamped_c11*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_neg[0,:,:]*xs1_pos[0,:,:]*xs2_neg[0,:,:],self.clamped_c12*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_neg[0,:,:]*xs1_neg[0,:,:]*xs2_pos[0,:,:],self.clamped_c13*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_neg[0,:,:]*xs1_neg[0,:,:]*xs2_pos[0,:,:],self.clamped_c14*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_neg[0,:,:]*xs1_neg[0,:,:]*xs2_neg[0,:,:],self.clamped_c15*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[0,:,:]*xs0_neg[0,:,:]*xs1_neg[0,:,:]*xs2_neg[0,:,:],self.clamped_c16*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_pos[0,:,:]*xs1_pos[0,:,:]*xs2_pos[0,:,:],self.clamped_c17*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_pos[0,:,:]*xs1_pos[0,:,:]*xs2_pos[0,:,:],self.clamped_c18*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_pos[0,:,:]*xs1_pos[0,:,:]*xs2_neg[0,:,:],self.clamped_c19*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_pos[0,:,:]*xs1_pos[0,:,:]*xs2_neg[0,:,:],self.clamped_c20*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_pos[0,:,:]*xs1_neg[0,:,:]*xs2_pos[0,:,:],self.clamped_c21*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_pos[0,:,:]*xs1_neg[0,:,:]*xs2_pos[0,:,:],self.clamped_c22*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_pos[0,:,:]*xs1_neg[0,:,:]*xs2_neg[0,:,:],self.clamped_c23*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_pos[0,:,:]*xs1_neg[0,:,:]*xs2_neg[0,:,:],self.clamped_c24*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_neg[0,:,:]*xs1_pos[0,:,:]*xs2_pos[0,:,:],self.clamped_c25*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_neg[0,:,:]*xs1_pos[0,:,:]*xs2_pos[0,:,:],self.clamped_c26*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_neg[0,:,:]*xs1_pos[0,:,:]*xs2_neg[0,:,:],self.clamped_c27*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_neg[0,:,:]*xs1_pos[0,:,:]*xs2_neg[0,:,:],self.clamped_c28*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_neg[0,:,:]*xs1_neg[0,:,:]*xs2_pos[0,:,:],self.clamped_c29*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_neg[0,:,:]*xs1_neg[0,:,:]*xs2_pos[0,:,:],self.clamped_c30*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_neg[0,:,:]*xs1_neg[0,:,:]*xs2_neg[0,:,:],self.clamped_c31*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[0,:,:]*xs0_neg[0,:,:]*xs1_neg[0,:,:]*xs2_neg[0,:,:],self.clamped_c32*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_pos[1,:,:]*xs1_pos[1,:,:]*xs2_pos[1,:,:],self.clamped_c1 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_pos[1,:,:]*xs1_pos[1,:,:]*xs2_pos[1,:,:],self.clamped_c2 *ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_pos[1,:,:]*xs1_pos[1,:,:]*xs2_neg[1,:,:],self.clamped_c3 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_pos[1,:,:]*xs1_pos[1,:,:]*xs2_neg[1,:,:],self.clamped_c4 *ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_pos[1,:,:]*xs1_neg[1,:,:]*xs2_pos[1,:,:],self.clamped_c5 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_pos[1,:,:]*xs1_neg[1,:,:]*xs2_pos[1,:,:],self.clamped_c6 *ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_pos[1,:,:]*xs1_neg[1,:,:]*xs2_neg[1,:,:],self.clamped_c7 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_pos[1,:,:]*xs1_neg[1,:,:]*xs2_neg[1,:,:],self.clamped_c8 *ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_neg[1,:,:]*xs1_pos[1,:,:]*xs2_pos[1,:,:],self.clamped_c9 *ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_neg[1,:,:]*xs1_pos[1,:,:]*xs2_pos[1,:,:],self.clamped_c10*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_neg[1,:,:]*xs1_pos[1,:,:]*xs2_neg[1,:,:],self.clamped_c11*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_neg[1,:,:]*xs1_pos[1,:,:]*xs2_neg[1,:,:],self.clamped_c12*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_neg[1,:,:]*xs1_neg[1,:,:]*xs2_pos[1,:,:],self.clamped_c13*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_neg[1,:,:]*xs1_neg[1,:,:]*xs2_pos[1,:,:],self.clamped_c14*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_neg[1,:,:]*xs1_neg[1,:,:]*xs2_neg[1,:,:],self.clamped_c15*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_pos[1,:,:]*xs0_neg[1,:,:]*xs1_neg[1,:,:]*xs2_neg[1,:,:],self.clamped_c16*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_pos[1,:,:]*xs1_pos[1,:,:]*xs2_pos[1,:,:],self.clamped_c17*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_pos[1,:,:]*xs1_pos[1,:,:]*xs2_pos[1,:,:],self.clamped_c18*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_pos[1,:,:]*xs1_pos[1,:,:]*xs2_neg[1,:,:],self.clamped_c19*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_pos[1,:,:]*xs1_pos[1,:,:]*xs2_neg[1,:,:],self.clamped_c20*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_pos[1,:,:]*xs1_neg[1,:,:]*xs2_pos[1,:,:],self.clamped_c21*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_pos[1,:,:]*xs1_neg[1,:,:]*xs2_pos[1,:,:],self.clamped_c22*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_pos[1,:,:]*xs1_neg[1,:,:]*xs2_neg[1,:,:],self.clamped_c23*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_pos[1,:,:]*xs1_neg[1,:,:]*xs2_neg[1,:,:],self.clamped_c24*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_neg[1,:,:]*xs1_pos[1,:,:]*xs2_pos[1,:,:],self.clamped_c25*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_neg[1,:,:]*xs1_pos[1,:,:]*xs2_pos[1,:,:],self.clamped_c26*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_neg[1,:,:]*xs1_pos[1,:,:]*xs2_neg[1,:,:],self.clamped_c27*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_neg[1,:,:]*xs1_pos[1,:,:]*xs2_neg[1,:,:],self.clamped_c28*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_neg[1,:,:]*xs1_neg[1,:,:]*xs2_pos[1,:,:],self.clamped_c29*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_neg[1,:,:]*xs1_neg[1,:,:]*xs2_pos[1,:,:],self.clamped_c30*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_neg[1,:,:]*xs1_neg[1,:,:]*xs2_neg[1,:,:],self.clamped_c31*ws0_pos*tf.tile(self.pruning_mask,[self.TM,self.TN]))
-				self.out=self.out+K.dot(x_neg[1,:,:]*xs0_neg[1,:,:]*xs1_neg[1,:,:]*xs2_neg[1,:,:],self.clamped_c32*ws0_neg*tf.tile(self.pruning_mask,[self.TM,self.TN]))
+					self.out=self.lut_expand(x,lut_w)
 
 			else:
 				x_expanded=0
@@ -764,6 +482,24 @@ class binary_dense(Layer):
 					x_expanded=x_expanded+x[l,:,:]
 				self.out=K.dot(x_expanded,self.clamped_w*tf.tile(self.pruning_mask,[self.TM,self.TN]))
 		return self.out
+	def lut_expand(self,x,lut_w):
+		'''LUTNet product of the [levels,batch,n_in] activations x with the effective LUT weights lut_w.'''
+		x_m=0
+		out=0
+		for l in range(self.levels):
+			shuf=lut_shuffle(x[l,:,:],self.rand_map_idx,len(self.rand_map_exp)) # randomised subsequent input connections
+
+			if self.lut_impl=='onehot': # LUT contents gathered at the minterm addressed by the input signs, see lut_gather
+				out=out+lut_gather(x[l,:,:],shuf,lut_w)
+			else:
+				x_m=x_m+lut_minterms(*lut_selectors(x[l,:,:],shuf),axis=1) # binary levels share the same LUTs, so their minterms are summed before the dot product
+
+		if self.lut_impl=='unrolled':
+			for i in range(2**(self.LUT_K-self.LUT_N)):
+				out=out+K.dot(x_m[:,i,:],lut_w[i])
+		elif self.lut_impl!='onehot': # whole truth table contracted in one matmul
+			out=lut_contract(x_m,lut_w)
+		return out
 	def  get_output_shape_for(self,input_shape):
 		return (input_shape[0], self.n_out)
 	def compute_output_shape(self,input_shape):
@@ -0,0 +1,102 @@
+'''Checks the LUT expansion of binary_conv/binary_dense against the original (5,1)-LUTNet formulation.
+
+The reference is the expression binarization_utils.py had before the expansion was collapsed: for every binary level,
+one K.dot per truth table entry c1..c32 between the product of the pos/neg selectors of the LUT's first input and its
+three randomly connected inputs, and the entry's tiled c times the selector of the BRAM weight and the pruning mask,
+i.e. 64 dot products for two levels. It is built from the same layer variables as the layer under test and evaluated on
+random inputs, pruning masks and randomisation maps, with BINARY on and off, for dense and conv (stride 1 and 2) layers.
+The outputs and the gradients with respect to the input and every trainable weight have to agree.
+Other lut_impl values can be checked as well; 'onehot' is expected to differ for the stride 2 layers, whose 'same'
+padding feeds LUTs inputs that are exactly zero.
+
+Usage: python check_lut_expansion.py [lut_impl=unrolled] [tol=1e-4]
+'''
+import sys
+import numpy as np
+import tensorflow as tf
+from keras import backend as K
+from binarization_utils import binarize, binary_conv, binary_dense
+
+def shuffle(x,rand_map_exp,perm):
+	'''x gathered along its last axis by rand_map_exp, through the transposes of the original code.'''
+	inv=[perm.index(i) for i in range(len(perm))]
+	shuf=tf.gather_nd(tf.transpose(x,perm=perm),tf.cast(rand_map_exp,tf.int32))
+	return tf.transpose(shuf,perm=inv)
+
+def expansion(levels,c,w1,mask):
+	'''Sum over the binary levels and truth table entries of K.dot(activation minterm, weight minterm).
+	levels holds per binary level the first LUT input and the list of its randomly connected inputs. c is the list of the
+	32 clamped and tiled entries, w1 the clamped BRAM weights and mask the tiled pruning mask, all of shape [P,F].
+	Bit 4-i of an entry index picks the neg selector of input i, bit 0 that of the BRAM weight.
+	'''
+	ws0_pos=(1+binarize(w1))/2
+	ws0_neg=(1-binarize(w1))/2
+	out=0
+	for x,shuf in levels:
+		pos=[(1+binarize(x))/2*abs(x)]+[(1+binarize(s))/2 for s in shuf] # Lagrangian interpolating polynomial
+		neg=[(1-binarize(x))/2*abs(x)]+[(1-binarize(s))/2 for s in shuf]
+		for k in range(32):
+			m=1
+			for i in range(4):
+				m=m*(neg[i] if (k>>(4-i))&1 else pos[i])
+			out=out+K.dot(m,c[k]*(ws0_neg if k&1 else ws0_pos)*mask)
+	return out
+
+def clamp(layer):
+	return binarize if layer.BINARY else lambda t: K.clip(t,-1,1)
+
+def reference_dense(layer,x):
+	gamma=K.abs(layer.gamma)
+	c=[gamma*clamp(layer)(tf.tile(layer.c[k],[layer.TM,layer.TN])) for k in range(32)]
+	mask=tf.tile(layer.pruning_mask,[layer.TM,layer.TN])
+	levels=[(x[l],[shuffle(x[l],r,[1,0]) for r in layer.rand_map_exp]) for l in range(layer.levels)]
+	return expansion(levels,c,clamp(layer)(layer.bram_w[0]),mask)
+
+def reference_conv(layer,x):
+	gamma=K.abs(layer.gamma)
+	flat=lambda t: tf.reshape(t,[-1,layer.nfilters])
+	c=[flat(gamma*clamp(layer)(tf.tile(layer.c[k],[1,1,layer.TM,layer.TN]))) for k in range(32)]
+	mask=flat(tf.tile(tf.reshape(layer.pruning_mask,layer.tile_size),[1,1,layer.TM,layer.TN]))
+	levels=[]
+	for l in range(layer.levels):
+		patches=tf.extract_image_patches(x[l],[1,layer.k,layer.k,1],[1,layer.strides[0],layer.strides[1],1],[1,1,1,1],padding=layer.PADDING)
+		levels.append((patches,[shuffle(patches,r,[3,0,1,2]) for r in layer.rand_map_exp]))
+	return expansion(levels,c,flat(clamp(layer)(layer.bram_w[0])),mask)
+
+def compare(name,layer,x,reference,tol):
+	'''Builds layer on x, randomises its pruning mask and randomisation maps and compares it with reference(layer,x).'''
+	layer.build(x.get_shape().as_list())
+	rng=np.random.RandomState(1)
+	K.set_value(layer.pruning_mask,(rng.rand(*K.int_shape(layer.pruning_mask))>0.3).astype(np.float32))
+	for r in layer.rand_map_exp:
+		K.set_value(r,rng.permutation(K.int_shape(r)[0]).reshape(-1,1).astype(np.float32))
+	y=layer.call(x)
+	y_ref=reference(layer,x)
+	r=tf.constant(rng.randn(*y_ref.get_shape().as_list()).astype(np.float32))
+	variables=[x]+list(layer.trainable_weights)
+	grads=tf.gradients(tf.reduce_sum(y*r),variables)
+	grads_ref=tf.gradients(tf.reduce_sum(y_ref*r),variables)
+	sess=K.get_session()
+	out,out_ref=sess.run([y,y_ref])
+	g,g_ref=sess.run([grads,grads_ref])
+	err=[np.max(np.abs(out-out_ref))/np.max(np.abs(out_ref))]
+	err+=[np.max(np.abs(a-b))/max(np.max(np.abs(b)),1e-12) for a,b in zip(g,g_ref)]
+	ok=max(err)<tol
+	print('%s: output rel. error %.2e, gradient rel. errors %s: %s'%(name,err[0],' '.join('%.2e'%e for e in err[1:]),'ok' if ok else 'MISMATCH'))
+	return ok
+
+if __name__ == "__main__":
+	opts=dict(arg.split('=',1) for arg in sys.argv[1:])
+	lut_impl=opts.get('lut_impl','unrolled')
+	tol=float(opts.get('tol',1e-4))
+	np.random.seed(0)
+	rng=np.random.RandomState(0)
+	xd=tf.constant(rng.randn(2,8,64).astype(np.float32)) # [levels,batch,n_in]
+	xc=tf.constant(rng.randn(2,4,8,8,16).astype(np.float32)) # [levels,batch,rows,cols,ch_in]
+	ok=True
+	for BINARY in [True,False]:
+		ok&=compare('binary_dense, BINARY=%s'%BINARY,binary_dense(64,32,levels=2,BINARY=BINARY,TM=4,TN=2,lut_impl=lut_impl),xd,reference_dense,tol)
+		for strides in [(1,1),(2,2)]:
+			layer=binary_conv(16,16,3,'valid' if strides==(1,1) else 'same',strides=strides,levels=2,BINARY=BINARY,TM=4,TN=2,lut_impl=lut_impl)
+			ok&=compare('binary_conv stride %d, BINARY=%s'%(strides[0],BINARY),layer,xc,reference_conv,tol)
+	sys.exit(0 if ok else 1)
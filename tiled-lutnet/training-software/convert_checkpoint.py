@@ -0,0 +1,78 @@
+'''Converts Keras .h5 checkpoints saved before binary_conv/binary_dense became (K,N)-generic to the current layout.
+
+Keras loads layer weights by their order in each layer's weight_names. LUT layers held the 2^K truth table entries as
+Variable_1:0..Variable_{2^K}:0 and the N BRAM weights after them; they are now one stacked dataset c:0 of shape
+[2^K]+tile_size, followed by the BRAM weights as Variable_1:0..Variable_N:0. Checkpoints written by the old code fail
+to load into the current LUT layers; this rewrites them in place or into a copy. gamma (Variable:0), the randomisation
+maps, the pruning masks, the BNN layers and the Residual_sign means are unchanged. Any optimizer_weights group is
+dropped, as the optimizer state no longer matches the trainable weights of the LUT layers.
+
+Usage: python convert_checkpoint.py <old.h5> [<new.h5>] [lut_k=5] [lut_n=1]
+'''
+import re
+import sys
+from shutil import copyfile
+import numpy as np
+import h5py
+
+def weight_order(names):
+	'''names in the order the current LUT layers create their weights: c:0, the BRAM weights, gamma, then the rest as stored.'''
+	def key(name):
+		n=name.split('/')[-1]
+		if n=='c:0':
+			return (0,0)
+		if n.startswith('Variable_'):
+			return (1,int(n[len('Variable_'):-2]))
+		if n=='Variable:0':
+			return (2,0)
+		return (3,0) # randomisation maps and pruning mask, already in creation order
+	return sorted(names,key=key)
+
+def convert_layer(g,lut_k=5,lut_n=1):
+	'''Converts the weights group g of one binary layer in place; returns True if it was a LUT layer, BNN layers are left as they are.'''
+	names=[n.decode('utf-8') if isinstance(n,bytes) else n for n in g.attrs['weight_names']]
+	scope=names[0].rsplit('/',1)[0]+'/'
+	variables=[n for n in names if re.match(r'Variable_\d+:0$',n.split('/')[-1])]
+	lut=len(variables)>lut_n
+	if lut:
+		if len(variables)!=2**lut_k+lut_n:
+			raise ValueError('%s has %d weight variables, not the %d of a (%d,%d)-LUT layer'%(scope[:-1],len(variables),2**lut_k+lut_n,lut_k,lut_n))
+		c=np.stack([np.array(g[scope+'Variable_%d:0'%(i+1)]) for i in range(2**lut_k)])
+		bram=[np.array(g[scope+'Variable_%d:0'%(2**lut_k+i+1)]) for i in range(lut_n)]
+		for n in variables:
+			del g[n]
+		g.create_dataset(scope+'c:0',data=c)
+		for i,w in enumerate(bram):
+			g.create_dataset(scope+'Variable_%d:0'%(i+1),data=w)
+		names=[n for n in names if n not in variables]+[scope+'c:0']+[scope+'Variable_%d:0'%(i+1) for i in range(lut_n)]
+		g.attrs['weight_names']=np.array([n.encode('utf-8') for n in weight_order(names)]) # as Keras writes them
+	return lut
+
+def convert(src,dst=None,lut_k=5,lut_n=1):
+	'''Converts the checkpoint src, in place or into a copy at dst. Returns the names of the converted LUT layers.'''
+	if dst is not None:
+		copyfile(src,dst)
+		src=dst
+	f=h5py.File(src,'r+')
+	weights=f['model_weights'] if 'model_weights' in f else f # model.save() or model.save_weights() file
+	layer_names=[n.decode('utf-8') if isinstance(n,bytes) else n for n in weights.attrs['layer_names']]
+	luts=[]
+	for name in layer_names:
+		g=weights[name]
+		if not name.startswith('binary_') or not len(g.attrs['weight_names']):
+			continue
+		if any(n.endswith(b'/c:0') if isinstance(n,bytes) else n.endswith('/c:0') for n in g.attrs['weight_names']):
+			f.close()
+			raise ValueError('%s is already in the current layout'%name)
+		if convert_layer(g,lut_k,lut_n):
+			luts.append(name)
+	if 'optimizer_weights' in f:
+		del f['optimizer_weights']
+	f.close()
+	return luts
+
+if __name__ == "__main__":
+	files=[arg for arg in sys.argv[1:] if '=' not in arg]
+	opts=dict(arg.split('=',1) for arg in sys.argv[1:] if '=' in arg)
+	luts=convert(files[0],files[1] if len(files)>1 else None,int(opts.get('lut_k',5)),int(opts.get('lut_n',1)))
+	print('converted LUT layers: %s'%(', '.join(luts) or 'none'))
@@ -0,0 +1,137 @@
+'''Multi-process data-parallel training on CPUs by local parameter averaging.
+
+Each worker process builds its own copy of the model in its own TF session, pinned to its own share of the CPUs, and
+trains on its own shard of the training set. Every sync_every steps the workers send their weights to the parent,
+which averages them (latent LUT/BNN weights, batch normalisation statistics and residual means alike) and sends the
+average back. With sync_every=1 this is synchronous data-parallel training with an effective batch of workers*batch_size;
+larger values trade some statistical efficiency for less synchronisation. Optimizer state (Adam moments) stays local.
+
+Workers are forked, so build_model and make_flow may be closures over the (memory-mapped or in-memory) training data,
+and the DataParallel pool has to be started before the parent creates its own TF session. Forked workers would all
+inherit the parent's NumPy random state, so worker rank reseeds it with seed+rank before building its flow: shards
+are shuffled and augmented independently.
+How this scales across cores has not been measured; train_data_parallel reports it against a given workers=1 run.
+'''
+import os
+import time
+import multiprocessing
+import numpy as np
+
+def cpu_sets(workers):
+	'''Splits the CPUs this process may run on into workers contiguous blocks, so workers stay on one socket where possible.'''
+	cpus=sorted(os.sched_getaffinity(0)) if hasattr(os,'sched_getaffinity') else list(range(multiprocessing.cpu_count()))
+	n=max(1,len(cpus)//workers)
+	return [cpus[i*n:(i+1)*n] or cpus for i in range(workers)]
+
+def average_weights(weights):
+	'''Element-wise mean of a list of get_weights() lists.'''
+	return [np.mean([w[i] for w in weights],axis=0).astype(weights[0][i].dtype) for i in range(len(weights[0]))]
+
+def worker(conn,build_model,make_flow,rank,cpus,seed):
+	if hasattr(os,'sched_setaffinity'):
+		os.sched_setaffinity(0,cpus)
+	np.random.seed(seed+rank) # own shuffling and augmentation draws
+	import tensorflow as tf
+	from keras import backend as K
+	K.set_session(tf.Session(config=tf.ConfigProto(intra_op_parallelism_threads=len(cpus),inter_op_parallelism_threads=1)))
+	model=build_model()
+	flow=make_flow(rank)
+	conn.send(True)
+	while True:
+		msg=conn.recv()
+		if msg is None:
+			break
+		weights,steps=msg
+		model.set_weights(weights)
+		t=time.time()
+		metrics=[model.train_on_batch(*next(flow)) for _ in range(steps)]
+		conn.send((model.get_weights(),np.mean(metrics,axis=0),time.time()-t))
+	conn.close()
+
+def shuffled_flow(X,y,batch_size):
+	'''Endless generator of shuffled batch_size batches of (X,y) without augmentation, as fit() would draw them.'''
+	n=X.shape[0]
+	while True:
+		order=np.random.permutation(n)
+		for i in range(0,n-batch_size+1,batch_size):
+			idx=np.sort(order[i:i+batch_size])
+			yield X[idx],y[idx]
+
+class DataParallel(object):
+	'''Pool of training workers. build_model() returns a compiled model and make_flow(rank) the generator of batch_size batches of worker rank.
+	Worker rank seeds np.random with seed+rank; by default seed is drawn from the parent's np.random.
+	'''
+	def __init__(self,build_model,make_flow,workers,batch_size,sync_every=1,seed=None):
+		self.batch_size=batch_size
+		self.sync_every=sync_every
+		if seed is None:
+			seed=np.random.randint(2**31-workers)
+		ctx=multiprocessing.get_context('fork') if hasattr(multiprocessing,'get_context') else multiprocessing
+		self.conns=[]
+		self.procs=[]
+		for rank,cpus in enumerate(cpu_sets(workers)):
+			parent,child=ctx.Pipe()
+			p=ctx.Process(target=worker,args=(child,build_model,make_flow,rank,cpus,seed))
+			p.daemon=True
+			p.start()
+			self.conns.append(parent)
+			self.procs.append(p)
+		for c in self.conns:
+			c.recv() # wait until every worker has built its model
+	def step(self,weights,steps):
+		'''Trains every worker for steps batches from weights; returns the averaged weights, mean metrics and worker compute times.'''
+		for c in self.conns:
+			c.send((weights,steps))
+		results=[c.recv() for c in self.conns]
+		return average_weights([r[0] for r in results]),np.mean([r[1] for r in results],axis=0),[r[2] for r in results]
+	def close(self):
+		for c in self.conns:
+			c.send(None)
+		for p in self.procs:
+			p.join()
+
+def train_data_parallel(pool,model,steps_per_epoch,epochs,validation_data,weights_path=None,single_worker_ips=None):
+	'''Trains model with the workers of pool for epochs of steps_per_epoch batches per worker, in the manner of fit_generator.
+	After each epoch the averaged weights are evaluated on validation_data and, if the accuracy is the best so far, saved to
+	weights_path as ModelCheckpoint(save_best_only=True) would. Returns the per-epoch history, including the training
+	throughput in images/s and the worker utilisation: the fraction of worker time spent training rather than waiting for
+	the weight exchange. Utilisation says nothing about how fast each worker trains on its share of the CPUs; scaling is
+	only measured against single_worker_ips, the images/s of a workers=1 run on the same machine, if given. Then the
+	history also holds the speedup over that run and the scaling efficiency speedup/workers.
+	'''
+	history={'loss':[],'acc':[],'val_loss':[],'val_acc':[],'images_per_s':[],'utilisation':[]}
+	if single_worker_ips:
+		history.update(speedup=[],scaling_efficiency=[])
+	best=-np.inf
+	weights=model.get_weights()
+	workers=len(pool.conns)
+	for epoch in range(epochs):
+		t=time.time()
+		metrics=[]
+		compute=0
+		for s in range(0,steps_per_epoch,pool.sync_every):
+			weights,m,times=pool.step(weights,min(pool.sync_every,steps_per_epoch-s))
+			metrics.append(m)
+			compute+=sum(times)
+		wall=time.time()-t
+		model.set_weights(weights)
+		val_loss,val_acc=model.evaluate(validation_data[0],validation_data[1],verbose=0)[:2]
+		loss,acc=np.mean(metrics,axis=0)[:2]
+		ips=workers*steps_per_epoch*pool.batch_size/wall
+		utilisation=compute/(workers*wall)
+		for k,v in zip(['loss','acc','val_loss','val_acc'],[loss,acc,val_loss,val_acc]):
+			history[k].append(float(v))
+		history['images_per_s'].append(ips)
+		history['utilisation'].append(utilisation)
+		scaling=''
+		if single_worker_ips:
+			speedup=ips/single_worker_ips
+			history['speedup'].append(speedup)
+			history['scaling_efficiency'].append(speedup/workers)
+			scaling=' - speedup: %.2f - scaling efficiency: %.2f'%(speedup,speedup/workers)
+		print('Epoch %d/%d - %ds - loss: %.4f - acc: %.4f - val_loss: %.4f - val_acc: %.4f - %.0f images/s - worker utilisation: %.2f%s'%(
+			epoch+1,epochs,wall,loss,acc,val_loss,val_acc,ips,utilisation,scaling))
+		if weights_path is not None and val_acc>best:
+			best=val_acc
+			model.save(weights_path)
+	return history
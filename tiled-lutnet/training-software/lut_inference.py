@@ -0,0 +1,226 @@
+'''Standalone NumPy inference engine for trained LUTNet models.
+
+Reads a Keras .h5 checkpoint (e.g. pretrained_network_51lut_tm.h5) with h5py and runs it without TensorFlow/Keras.
+Each LUT layer's binarised c parameters, BRAM bits w, randomisation maps and pruning mask are folded into explicit
+truth tables, which are evaluated by table lookup at the minterm index formed by the sign bits of the residual binary
+activations.
+The network follows model_architectures.py: LUT/BNN convolutions are 'valid' with stride 1 and max pooling is 2x2.
+
+Usage: python lut_inference.py <model.h5> <images.npy> [labels.npy] [batch_size]
+'''
+import sys
+import json
+import time
+import numpy as np
+import h5py
+
+batch_norm_eps=1e-4 # as in model_architectures.py
+
+class BinaryActivations(object):
+	'''Residual binary activations of shape [levels,batch,...].
+	neg holds the sign bits (True for negative, as in the LUT minterm numbering), scales the magnitude of each level.
+	'''
+	def __init__(self,neg,scales):
+		self.neg=neg
+		self.scales=scales
+	def values(self):
+		return (1-2*self.neg.astype(np.float32))*self.scales.reshape((-1,)+(1,)*(self.neg.ndim-1))
+
+def im2col(x,k):
+	'''[...,H,W,C] -> [...,H-k+1,W-k+1,k*k*C] 'valid' stride-1 patches, in tf.extract_image_patches order.'''
+	s=x.strides
+	shape=x.shape[:-3]+(x.shape[-3]-k+1,x.shape[-2]-k+1,k,k,x.shape[-1])
+	patches=np.lib.stride_tricks.as_strided(x,shape,s[:-3]+(s[-3],s[-2],s[-3],s[-2],s[-1]),writeable=False)
+	return patches.reshape(shape[:-3]+(-1,))
+
+def lut_table(c,w,gamma,mask):
+	'''Truth tables [2^(K-N),P,F] of a LUT layer with its BRAM inputs folded in.
+	c is the tiled [2^K,P,F] truth table, w the list of N [P,F] BRAM weights and mask the tiled [P,F] pruning mask.
+	Entry [a,p,f] is what LUT (p,f) contributes for activation minterm a.
+	'''
+	b=np.zeros(mask.shape,np.intp)
+	for wi in w:
+		b=b*2+(wi<0) # BRAM minterm, MSB first
+	c=c.reshape((-1,2**len(w))+c.shape[1:])
+	t=np.take_along_axis(c,b[np.newaxis,np.newaxis],axis=1)[:,0]
+	return (gamma*np.sign(t)*mask).astype(np.float32)
+
+def lut_lookup(idx,scales,table,chunk=2**16):
+	'''Sums table[idx[l,p,r],p,:] over p, weighted by scales[l] and summed over levels l, for every row r.
+	Each block of positions gathers the [F] outputs of its LUTs at the minterms of a block of rows, about chunk values at a
+	time, so only P*F values per row are read and added and the intermediates stay in cache.
+	'''
+	T,P,F=table.shape
+	flat=table.transpose(1,0,2).reshape(P*T,F) # row p*T+a holds what the LUTs of position p output for minterm a
+	R=idx.shape[2]
+	rows=min(R,max(1,chunk//F))
+	step=max(1,chunk//(rows*F)) # positions per gather
+	offset=(np.arange(P)*T)[:,np.newaxis]
+	out=np.empty((R,F),np.float32)
+	for r0 in range(0,R,rows):
+		r1=min(R,r0+rows)
+		rows_idx=idx[:,:,r0:r1]+offset
+		acc=np.zeros((idx.shape[0],r1-r0,F),np.float32)
+		for l in range(idx.shape[0]):
+			for p0 in range(0,P,step):
+				g=flat.take(rows_idx[l,p0:p0+step],axis=0)
+				acc[l]+=g[0] if step==1 else g.sum(axis=0)
+		out[r0:r1]=np.tensordot(scales,acc,1)
+	return out
+
+def tile_mask(mask,shape):
+	'''Tiles a stored pruning mask over a [k,k,ch_in,nfilters] or [n_in,n_out] weight shape.
+	Conv masks are stored as [k/TRC*k/TRC*ch_in/TM,nfilters/TN]; the smallest TRC consistent with the shapes is used.
+	'''
+	if len(shape)==2:
+		return np.tile(mask,[shape[0]//mask.shape[0],shape[1]//mask.shape[1]])
+	for trc in range(1,shape[0]+1):
+		kt=shape[0]//trc
+		if shape[0]%trc==0 and mask.shape[0]%(kt*kt)==0 and shape[2]%(mask.shape[0]//(kt*kt))==0:
+			break
+	tile=[kt,kt,mask.shape[0]//(kt*kt),mask.shape[1]]
+	return np.tile(mask.reshape(tile),[s//t for s,t in zip(shape,tile)])
+
+class BinaryLayer(object):
+	'''binary_conv/binary_dense in inference mode: LUT layers by table lookup, BNN and first layers as binary-weight products.'''
+	def __init__(self,weights,conv):
+		self.conv=conv
+		self.gamma=gamma=abs(float(weights['Variable:0']))
+		bram=[weights['Variable_%d:0'%i] for i in range(1,len(weights)) if 'Variable_%d:0'%i in weights]
+		shape=bram[0].shape # [k,k,ch_in,nfilters] or [n_in,n_out]
+		self.k=shape[0] if conv else 1
+		self.nfilters=shape[-1]
+		self.lut='c:0' in weights
+		self.mask=mask=tile_mask(weights['pruning_mask:0'],shape).reshape(-1,self.nfilters)
+		if self.lut:
+			c=weights['c:0']
+			c=np.tile(c,[1]+[s//t for s,t in zip(shape,c.shape[1:])]).reshape(c.shape[0],-1,self.nfilters)
+			self.table=lut_table(c,[wi.reshape(-1,self.nfilters) for wi in bram],gamma,mask)
+			self.rand_map_exp=[]
+			while 'rand_map_exp_%d:0'%len(self.rand_map_exp) in weights:
+				self.rand_map_exp.append(weights['rand_map_exp_%d:0'%len(self.rand_map_exp)].astype(np.intp).ravel())
+		else:
+			self.w=(gamma*np.sign(bram[0].reshape(-1,self.nfilters))*mask).astype(np.float32)
+	def __call__(self,x):
+		if isinstance(x,BinaryActivations) and self.lut:
+			neg=x.neg
+			if self.conv:
+				neg=im2col(neg,self.k)
+			out_shape=neg.shape[1:-1]
+			neg=np.ascontiguousarray(np.moveaxis(neg.reshape(neg.shape[0],-1,neg.shape[-1]),-1,1)) # [levels,P,rows]
+			idx=neg.astype(np.uint8)
+			for m in self.rand_map_exp:
+				idx=idx*2+neg[:,m] # minterm index over (x0, shuffled inputs), MSB first
+			return lut_lookup(idx,x.scales,self.table).reshape(out_shape+(self.nfilters,))
+		if isinstance(x,BinaryActivations):
+			x=x.values().sum(axis=0) # BNN layer: binary levels summed
+		if self.conv:
+			x=im2col(np.ascontiguousarray(x,np.float32),self.k)
+		return x.dot(self.w)
+
+class BatchNorm(object):
+	def __init__(self,weights,eps):
+		scale=weights['gamma:0']/np.sqrt(weights['moving_variance:0']+eps)
+		self.scale=scale.astype(np.float32)
+		self.shift=(weights['beta:0']-weights['moving_mean:0']*scale).astype(np.float32)
+	def __call__(self,x):
+		return x*self.scale+self.shift
+
+class ResidualSign(object):
+	'''Residual binarisation. A residual of exactly zero counts as negative, as with the hardware's greater-than thresholds.'''
+	def __init__(self,weights):
+		self.scales=np.abs(weights['means:0']).astype(np.float32)
+	def __call__(self,x):
+		resid=x
+		neg=[]
+		for m in self.scales:
+			n=np.logical_not(resid>0)
+			resid=resid-(1-2*n.astype(np.float32))*m
+			neg.append(n)
+		if len(self.scales)==1:
+			return x-resid
+		return BinaryActivations(np.stack(neg),self.scales)
+
+def max_pool(x,pool=2):
+	b,h,w,c=x.shape
+	h,w=h//pool*pool,w//pool*pool
+	return x[:,:h,:w].reshape(b,h//pool,pool,w//pool,pool,c).max(axis=(2,4))
+
+def softmax(x):
+	e=np.exp(x-x.max(axis=-1,keepdims=True))
+	return e/e.sum(axis=-1,keepdims=True)
+
+def load_weights(path):
+	'''(name,weights) of every layer stored in a Keras .h5 file, with weights keyed by variable name, and the max pooling sizes.'''
+	f=h5py.File(path,'r')
+	g=f['model_weights'] if 'model_weights' in f else f
+	pools={}
+	if 'model_config' in f.attrs:
+		config=f.attrs['model_config']
+		config=json.loads(config.decode('utf-8') if isinstance(config,bytes) else config)['config']
+		for l in (config['layers'] if isinstance(config,dict) else config):
+			if l['class_name']=='MaxPooling2D':
+				pools[l['config']['name']]=l['config']['pool_size'][0]
+	layers=[]
+	for name in g.attrs['layer_names']:
+		name=name.decode('utf-8') if isinstance(name,bytes) else name
+		weights={}
+		for wn in g[name].attrs.get('weight_names',[]):
+			wn=wn.decode('utf-8') if isinstance(wn,bytes) else wn
+			weights[wn.split('/')[-1]]=np.array(g[name][wn])
+		layers.append((name,weights))
+	f.close()
+	return layers,pools
+
+def load_model(path):
+	'''Builds the list of inference layers stored in a Keras .h5 file.'''
+	layers=[]
+	stored,pools=load_weights(path)
+	for name,weights in stored:
+		if name.startswith('binary_conv'):
+			layers.append((name,BinaryLayer(weights,conv=True)))
+		elif name.startswith('binary_dense'):
+			layers.append((name,BinaryLayer(weights,conv=False)))
+		elif name.startswith('batch_normalization'):
+			layers.append((name,BatchNorm(weights,batch_norm_eps)))
+		elif name.startswith('residual_sign'):
+			layers.append((name,ResidualSign(weights)))
+		elif name.startswith('max_pooling2d'):
+			layers.append((name,lambda x,p=pools.get(name,2): max_pool(x,p)))
+		elif name.startswith('my_flat'):
+			layers.append((name,lambda x: x.reshape(x.shape[0],-1)))
+		elif name.startswith('activation'):
+			layers.append((name,softmax))
+		elif name.startswith('input_scaling'):
+			continue # images are normalised before predict
+		else:
+			raise ValueError('unsupported layer '+name)
+	return layers
+
+def predict(layers,x,batch_size=100):
+	'''Class probabilities of the [-1,1] normalised images x.'''
+	if isinstance(layers[0][1],BinaryLayer) and not layers[0][1].conv:
+		x=x.reshape(x.shape[0],-1)
+	out=[]
+	for i in range(0,x.shape[0],batch_size):
+		a=x[i:i+batch_size].astype(np.float32)
+		for name,layer in layers:
+			a=layer(a)
+		out.append(a)
+	return np.concatenate(out)
+
+if __name__ == "__main__":
+	t=time.time()
+	layers=load_model(sys.argv[1])
+	print('loaded %d layers in %.3f s' % (len(layers),time.time()-t))
+	X=np.load(sys.argv[2])
+	if X.dtype==np.uint8: # same normalisation as Binary.py
+		X=2*(X.astype(np.float32)/255)-1
+	batch_size=int(sys.argv[4]) if len(sys.argv)>4 else 100
+	t=time.time()
+	pred=predict(layers,X,batch_size).argmax(axis=-1)
+	dt=time.time()-t
+	print('%d images in %.2f s (%.1f images/s)' % (len(X),dt,len(X)/dt))
+	if len(sys.argv)>3:
+		y=np.load(sys.argv[3]).reshape(-1)
+		print('accuracy: %.4f' % np.mean(pred==y))
@@ -0,0 +1,138 @@
+'''LUTNet initialisation from a pruned BNN, for any model and (K,N)-LUT microarchitecture.
+
+The LUTNet model's .h5 file (dummy_lutnet.h5, saved by a LUTNet model before training) gives the structure to fill in:
+every layer with a c:0 truth table is a LUT layer, of 2^K = len(c) entries, N BRAM-sourced inputs stored as
+Variable_1:0..Variable_N:0 and K-N-1 randomly connected inputs picked by rand_map_0, rand_map_1, ... Everything else
+(the first binary layer, batch normalisation, residual means) is copied from the layer of the same name in the BNN.
+
+A LUT layer starts out computing the BNN product of its first activation input and its first BRAM input, which holds
+the BNN weights: c is +-1 by the XNOR of the two and the other inputs are don't-cares. Without BRAM inputs (N=0) the
+tile-averaged BNN weights take the place of the BRAM input. The randomisation maps are drawn per tile and expanded
+across the tiles of the full weight array (rand_map_exp_*) with a few integer array operations.
+
+Usage: python lut_init.py <dummy_lutnet.h5> <baseline_pruned.h5> <pretrained_bin.h5>
+'''
+import re
+import sys
+import time
+from collections import OrderedDict
+from shutil import copyfile
+import numpy as np
+import h5py
+
+def random_maps(n,count=3):
+	'''count random permutations of range(n), drawn with np.random.shuffle in turn as lutnet_init.py has always drawn them.'''
+	maps=[]
+	for _ in range(count):
+		rand_map=np.arange(n)
+		np.random.shuffle(rand_map)
+		maps.append(rand_map)
+	return maps
+
+def expand_rand_map(rand_map,tile_shape,weight_shape):
+	'''rand_map of one tile of tile_shape expanded across the tiles of weight_shape, flattened over all axes but the last.
+	The map is tiled over the input axes, and every index is moved to the copy of the tile along the last input axis
+	(ch_in for conv, the inputs for dense layers) that its own position falls in.
+	'''
+	dims=list(weight_shape[:-1])
+	tdims=list(tile_shape[:-1])
+	rand_map_exp=np.tile(np.reshape(rand_map,tdims),[d//t for d,t in zip(dims,tdims)]).reshape(-1).astype(np.int64)
+	d,t=dims[-1],tdims[-1]
+	i=np.arange(rand_map_exp.size)
+	return rand_map_exp+t*(d//t-1)*(rand_map_exp//t)+t*((i%d)//t)
+
+def tile_mean(w,tile_shape):
+	'''Mean of w over its tiles of tile_shape, i.e. the tile that tf.tile would replicate to the closest w.'''
+	split=[]
+	for s,t in zip(w.shape,tile_shape):
+		split+=[s//t,t]
+	return np.mean(np.reshape(w,split),axis=tuple(range(0,len(split),2)))
+
+def lut_c(K,N,tile_shape,w=None):
+	'''Initial [2^K]+tile_shape truth table of a (K,N)-LUT layer with BNN weights w (only used if N=0).
+	Rows are in the minterm order of binarization_utils.lut_minterms: bit i of the row index (MSB first) is set when the
+	ith LUT input is negative, the activation inputs coming first and the BRAM inputs last.
+	'''
+	if N>=K:
+		raise ValueError('a (%d,%d)-LUT has no activation input'%(K,N))
+	rows=np.arange(2**K)
+	sign=1-2*((rows>>(K-1))&1) # first activation input
+	shape=(-1,)+(1,)*len(tile_shape)
+	if N>0:
+		sign=sign*(1-2*((rows>>(N-1))&1)) # first BRAM input
+		return np.reshape(sign,shape)*np.ones(tile_shape)
+	return np.reshape(sign,shape)*tile_mean(np.array(w),tile_shape)
+
+def layer_names(f):
+	'''Names of all layers of an open Keras .h5 file, in model order.'''
+	return [n.decode('utf-8') if isinstance(n,bytes) else n for n in f['model_weights'].attrs['layer_names']]
+
+def layer_weights(f,name):
+	'''(weight name -> dataset) of a layer of an open Keras .h5 file, e.g. 'c:0' or 'Variable_1:0'.'''
+	g=f['model_weights'][name]
+	names=[n.decode('utf-8') if isinstance(n,bytes) else n for n in g.attrs['weight_names']]
+	return OrderedDict((n.split('/')[-1],g[n]) for n in names)
+
+def lut_structure(weights):
+	'''(K,N) and the number of randomisation maps of a LUT layer given its weights.'''
+	K=int(np.log2(weights['c:0'].shape[0]))
+	N=len([n for n in weights if re.match(r'Variable_[1-9][0-9]*:0$',n)])
+	maps=len([n for n in weights if re.match(r'rand_map_[0-9]+:0$',n)])
+	if 2**K!=weights['c:0'].shape[0] or maps!=K-N-1:
+		raise ValueError('c:0 of %d entries, %d BRAM inputs and %d randomisation maps do not make a (K,N)-LUT'%(weights['c:0'].shape[0],N,maps))
+	return K,N,maps
+
+def write(ds,value):
+	ds[...]=np.reshape(value,ds.shape).astype(ds.dtype)
+
+def init_lut_layer(weights,bl_weights):
+	'''Initialises the weights of a LUT layer from those of the same layer of the BNN; returns its (K,N).'''
+	K,N,maps=lut_structure(weights)
+	w=np.array(bl_weights['Variable_1:0'])
+	tile_shape=weights['c:0'].shape[1:]
+	write(weights['c:0'],lut_c(K,N,tile_shape,w))
+	for i in range(N):
+		write(weights['Variable_%d:0'%(i+1)],w)
+	for i,rand_map in enumerate(random_maps(int(np.prod(tile_shape[:-1])),maps)):
+		write(weights['rand_map_%d:0'%i],rand_map)
+		write(weights['rand_map_exp_%d:0'%i],expand_rand_map(rand_map,tile_shape,w.shape))
+	write(weights['Variable:0'],bl_weights['Variable:0'])
+	write(weights['pruning_mask:0'],bl_weights['pruning_mask:0'])
+	return K,N
+
+def init_lutnet(dummy,baseline,dst):
+	'''Writes the LUTNet weights initialised from the BNN in baseline to dst, a copy of dummy.
+	Returns (name -> ((K,N) or None,surviving LUTs,LUTs)) of the binary layers, (K,N) being None for layers without LUTs.
+	'''
+	copyfile(dummy,dst)
+	f=h5py.File(dst,'r+')
+	bl=h5py.File(baseline,'r')
+	bl_layers=set(layer_names(bl))
+	layers=OrderedDict()
+	for name in layer_names(f):
+		weights=layer_weights(f,name)
+		if name not in bl_layers:
+			continue
+		bl_weights=layer_weights(bl,name)
+		if 'c:0' in weights:
+			lut=init_lut_layer(weights,bl_weights)
+		else:
+			lut=None
+			for n,ds in weights.items():
+				if n in bl_weights and bl_weights[n].shape==ds.shape:
+					write(ds,bl_weights[n])
+		if name.startswith('binary_'):
+			mask=np.array(bl_weights['pruning_mask:0'])
+			layers[name]=(lut,int(np.sum(mask)),int(mask.size))
+	bl.close()
+	f.close()
+	return layers
+
+def report(layers):
+	for name,(lut,luts,size) in layers.items():
+		print('%s: %s, %d/%d unpruned'%(name,'(%d,%d)-LUTs'%lut if lut else 'no LUTs',luts,size))
+
+if __name__ == "__main__":
+	t=time.time()
+	report(init_lutnet(*sys.argv[1:4]))
+	print('initialised in %.2f s'%(time.time()-t))
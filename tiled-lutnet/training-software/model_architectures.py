@@ -2,7 +2,7 @@
 import tensorflow as tf
 import keras
 from keras.models import Sequential, Model
-from keras.layers import Dense, Convolution2D, Activation, Flatten, MaxPooling2D,Input,Dropout,GlobalAveragePooling2D
+from keras.layers import Dense, Convolution2D, Activation, Flatten, MaxPooling2D,Input,Dropout,GlobalAveragePooling2D,Lambda
 from keras.layers.normalization import BatchNormalization
 from tensorflow.python.framework import ops
 from binarization_utils import *
@@ -10,60 +10,66 @@ from binarization_utils import *
 batch_norm_eps=1e-4
 batch_norm_alpha=0.1#(this is same as momentum)
 
-def get_model(dataset,resid_levels,LUT,BINARY,trainable_means):
+def get_model(dataset,resid_levels,LUT,BINARY,trainable_means,lut_impl='batched',LUT_K=5,LUT_N=1,im2col_budget=None,recompute=False,tile_reg=0,uint8_input=False):
+	lut_args=dict(lut_impl=lut_impl,LUT_K=LUT_K,LUT_N=LUT_N,recompute=recompute,tile_reg=tile_reg) # LUT layer implementation options and tile regularisation, shared by all LUTNet layers
+	conv_args=dict(lut_args,im2col_budget=im2col_budget) # plus the im2col memory budget of LUTNet convolutions
 	if dataset=='MNIST':
 		model=Sequential()
+		if uint8_input: # raw uint8 pixels are fed and scaled to [-1,1] per batch
+			model.add(Lambda(lambda x: 2*(x/255.)-1,input_shape=[784],name='input_scaling'))
 		model.add(binary_dense(levels=resid_levels,n_in=784,n_out=256,input_shape=[784],first_layer=True,BINARY=BINARY,TM=8,TN=8))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_dense(levels=resid_levels,n_in=int(model.output.get_shape()[2]),n_out=256,LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_dense(levels=resid_levels,n_in=int(model.output.get_shape()[2]),n_out=256,LUT=LUT,BINARY=BINARY,TM=8,TN=8,**lut_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_dense(levels=resid_levels,n_in=int(model.output.get_shape()[2]),n_out=256,LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_dense(levels=resid_levels,n_in=int(model.output.get_shape()[2]),n_out=256,LUT=LUT,BINARY=BINARY,TM=8,TN=8,**lut_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_dense(levels=resid_levels,n_in=int(model.output.get_shape()[2]),n_out=256,LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_dense(levels=resid_levels,n_in=int(model.output.get_shape()[2]),n_out=256,LUT=LUT,BINARY=BINARY,TM=8,TN=8,**lut_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_dense(levels=resid_levels,n_in=int(model.output.get_shape()[2]),n_out=10,LUT=LUT,BINARY=BINARY,TM=8,TN=10))
+		model.add(binary_dense(levels=resid_levels,n_in=int(model.output.get_shape()[2]),n_out=10,LUT=LUT,BINARY=BINARY,TM=8,TN=10,**lut_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Activation('softmax'))
 
 	
 	elif dataset=="CIFAR-10" or dataset=="SVHN":
 		model=Sequential()
+		if uint8_input: # raw uint8 pixels are fed and scaled to [-1,1] per batch
+			model.add(Lambda(lambda x: 2*(x/255.)-1,input_shape=[32,32,3],name='input_scaling'))
 		model.add(binary_conv(pruning_prob=0.1,nfilters=64,ch_in=3,k=3,padding='valid',input_shape=[32,32,3],first_layer=True,BINARY=BINARY,TM=1,TN=2))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_conv(levels=resid_levels,pruning_prob=0.1,nfilters=64,ch_in=64,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_conv(levels=resid_levels,pruning_prob=0.1,nfilters=64,ch_in=64,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8,**conv_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(MaxPooling2D(pool_size=(2, 2),strides=(2,2)))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
 
-		model.add(binary_conv(levels=resid_levels,pruning_prob=0.2,nfilters=128,ch_in=64,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_conv(levels=resid_levels,pruning_prob=0.2,nfilters=128,ch_in=64,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8,**conv_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_conv(levels=resid_levels,pruning_prob=0.2,nfilters=128,ch_in=128,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_conv(levels=resid_levels,pruning_prob=0.2,nfilters=128,ch_in=128,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8,**conv_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(MaxPooling2D(pool_size=(2, 2),strides=(2,2)))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
 
-		model.add(binary_conv(levels=resid_levels,pruning_prob=0.3,nfilters=256,ch_in=128,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_conv(levels=resid_levels,pruning_prob=0.3,nfilters=256,ch_in=128,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8,**conv_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_conv(levels=resid_levels,pruning_prob=0.3,nfilters=256,ch_in=256,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_conv(levels=resid_levels,pruning_prob=0.3,nfilters=256,ch_in=256,k=3,padding='valid',LUT=LUT,BINARY=BINARY,TM=8,TN=8,**conv_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 
 		model.add(my_flat())
 
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_dense(levels=resid_levels,pruning_prob=0.8,n_in=int(model.output.get_shape()[2]),n_out=512,LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_dense(levels=resid_levels,pruning_prob=0.8,n_in=int(model.output.get_shape()[2]),n_out=512,LUT=LUT,BINARY=BINARY,TM=8,TN=8,**lut_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_dense(levels=resid_levels,pruning_prob=0.8,n_in=int(model.output.get_shape()[2]),n_out=512,LUT=LUT,BINARY=BINARY,TM=8,TN=8))
+		model.add(binary_dense(levels=resid_levels,pruning_prob=0.8,n_in=int(model.output.get_shape()[2]),n_out=512,LUT=LUT,BINARY=BINARY,TM=8,TN=8,**lut_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Residual_sign(levels=resid_levels,trainable=trainable_means))
-		model.add(binary_dense(levels=resid_levels,pruning_prob=0.5,n_in=int(model.output.get_shape()[2]),n_out=10,LUT=LUT,BINARY=BINARY,TM=8,TN=10))
+		model.add(binary_dense(levels=resid_levels,pruning_prob=0.5,n_in=int(model.output.get_shape()[2]),n_out=10,LUT=LUT,BINARY=BINARY,TM=8,TN=10,**lut_args))
 		model.add(BatchNormalization(axis=-1, momentum=batch_norm_alpha, epsilon=batch_norm_eps))
 		model.add(Activation('softmax'))
 	else:
@@ -0,0 +1,162 @@
+'''Tile-norm pruning of binary layers, with per-layer thresholds or thresholds solved from a LUT budget.
+
+Each pruning mask entry covers one weight position of a layer's tile and is kept if the norm of that position over
+all tile copies exceeds the layer's threshold. The norms are computed with a single reshape and reduction per layer.
+The tiling is read off the stored pruning mask shape unless given, so any model whose binary layers store
+Variable_1:0 and pruning_mask:0 can be pruned; models/*/scripts/bnn_pruning.py only list thresholds and tilings.
+Only the pruning masks are written, in place and a block of rows at a time.
+
+For a LUT budget, the threshold of every pruned layer is found by binary search so that its surviving LUT count
+np.sum(pruning_mask) meets the budget. The count is that of prune_sweep.py: the mask entries of all binary layers but the first.
+
+Usage: python pruning.py <baseline_reg.h5> <pretrained_pruned.h5> luts=N [<layer>=N ...] [keep=<layer>,...] [normalisation=l2|l1]
+luts is the total LUT budget, split over the pruned layers in proportion to their size after any per-layer budgets
+(e.g. binary_conv_3=2000) are taken out. Layers in keep are not pruned; by default these are the first and last
+binary layers, which the bnn_pruning.py scripts leave unpruned with thresholds of -1.
+'''
+import sys
+import time
+from collections import OrderedDict
+from shutil import copyfile
+import numpy as np
+import h5py
+
+def binary_layers(f):
+	'''Names of the binary_conv/binary_dense layers of an open Keras .h5 file, in model order.'''
+	names=[n.decode('utf-8') if isinstance(n,bytes) else n for n in f['model_weights'].attrs['layer_names']]
+	return [n for n in names if n.startswith('binary_')]
+
+def layer_weights(f,name):
+	return f['model_weights'][name][name]
+
+def tiling(w_shape,mask_shape):
+	'''Tiling factors [TRC,TRC,TM,TN] or [TM,TN] of a weight shape whose tile is stored as a pruning mask of mask_shape.
+	Conv masks are [k/TRC*k/TRC*ch_in/TM,nfilters/TN]; the smallest TRC consistent with the shapes is used.
+	'''
+	if len(w_shape)==2:
+		return [w_shape[0]//mask_shape[0],w_shape[1]//mask_shape[1]]
+	k,ch_in,nfilters=w_shape[0],w_shape[2],w_shape[3]
+	for trc in range(1,k+1):
+		kt=k//trc
+		if k%trc==0 and mask_shape[0]%(kt*kt)==0 and ch_in%(mask_shape[0]//(kt*kt))==0:
+			return [trc,trc,ch_in//(mask_shape[0]//(kt*kt)),nfilters//mask_shape[1]]
+	raise ValueError('pruning mask %s does not tile weights %s'%(mask_shape,w_shape))
+
+def tile_norm(w,tiles,normalisation='l2'):
+	'''Norm of every tile position of w over the tiles copies along each axis, flattened to the pruning mask layout.
+	l2 is the root mean square and l1 the signed mean over the copies, as the bnn_pruning.py scripts have always computed
+	them. Copies of opposite sign cancel in l1, so it keeps a subset of what the mean absolute value would.
+	'''
+	split=[]
+	for s,t in zip(w.shape,tiles):
+		split+=[t,s//t]
+	w=w.reshape(split)
+	axes=tuple(range(0,len(split),2))
+	if normalisation=='l2':
+		norm=np.sqrt(np.mean(w**2,axis=axes))
+	elif normalisation=='l1':
+		norm=np.mean(w,axis=axes)
+	else:
+		raise ValueError('normalisation should be l1 or l2')
+	return norm.reshape(-1,norm.shape[-1])
+
+def threshold_for_budget(norm,budget):
+	'''Smallest threshold t, found by binary search over the sorted norms, with np.sum(norm>t)<=budget.'''
+	if budget>=norm.size:
+		return -1.
+	norm=np.sort(norm,axis=None)
+	values=np.unique(norm)
+	lo,hi=0,len(values)-1 # np.sum(norm>values[-1])==0<=budget
+	while lo<hi:
+		mid=(lo+hi)//2
+		if norm.size-np.searchsorted(norm,values[mid],side='right')<=budget:
+			hi=mid
+		else:
+			lo=mid+1
+	return float(values[lo])
+
+def layer_norms(f,normalisation='l2',names=None,tilings={}):
+	'''(name -> tile norms) of the binary layers (or only those in names) of an open Keras .h5 file, in model order.
+	tilings may give the tiling factors of a layer, e.g. {'binary_conv_2':[1,1,8,8]}; the others are read off the mask shapes.
+	'''
+	norms=OrderedDict()
+	for name in binary_layers(f):
+		if names is not None and name not in names:
+			continue
+		g=layer_weights(f,name)
+		w=np.array(g['Variable_1:0'])
+		norms[name]=tile_norm(w,tilings.get(name) or tiling(w.shape,g['pruning_mask:0'].shape),normalisation)
+	return norms
+
+def solve(norms,luts,budgets={},keep=()):
+	'''Thresholds (name -> t) of the binary layers given their tile norms in model order, for a total of luts LUTs over all layers but the first.
+	Layers in budgets get their own budget, layers in keep are not pruned and the rest share what is left in proportion to their size.
+	'''
+	names=list(norms)
+	thresholds=dict((n,-1.) for n in keep)
+	free=[n for n in names[1:] if n not in keep and n not in budgets]
+	left=luts-sum(norms[n].size for n in names[1:] if n in keep)-sum(budgets.values())
+	size=sum(norms[n].size for n in free)
+	for n in names:
+		if n in budgets:
+			thresholds[n]=threshold_for_budget(norms[n],budgets[n])
+		elif n in free:
+			thresholds[n]=threshold_for_budget(norms[n],max(0,int(left*norms[n].size//size)))
+	return thresholds
+
+def write_masks(f,masks,chunk=2**20):
+	'''Writes (name -> boolean mask) into the pruning_mask:0 datasets of an open Keras .h5 file, about chunk entries at a time.'''
+	for name,mask in masks.items():
+		ds=layer_weights(f,name)['pruning_mask:0']
+		mask=mask.reshape(ds.shape)
+		rows=max(1,chunk//max(1,mask[:1].size))
+		for r in range(0,ds.shape[0],rows):
+			ds[r:r+rows]=mask[r:r+rows].astype(ds.dtype)
+
+def open_pruned(src,dst=None):
+	'''src opened for writing its pruning masks: a copy at dst if given, as bnn_pruning.py keeps baseline_reg.h5, otherwise src itself.'''
+	if dst is not None and dst!=src:
+		copyfile(src,dst)
+		src=dst
+	return h5py.File(src,'r+')
+
+def prune(src,thresholds,dst=None,tilings={},normalisation='l2'):
+	'''Sets the pruning mask of every layer in thresholds (name -> t) to norm>t, in src or in a copy at dst.
+	Layers without a threshold keep their mask. Returns the surviving LUTs (name -> np.sum(pruning_mask)) of the pruned layers.
+	'''
+	f=open_pruned(src,dst)
+	unknown=set(thresholds)-set(binary_layers(f))
+	if unknown:
+		f.close()
+		raise ValueError('unknown layers '+', '.join(sorted(unknown)))
+	norms=layer_norms(f,normalisation,thresholds,tilings)
+	masks=OrderedDict((n,np.greater(norms[n],thresholds[n])) for n in norms)
+	write_masks(f,masks)
+	f.close()
+	return OrderedDict((n,int(np.sum(m))) for n,m in masks.items())
+
+if __name__ == "__main__":
+	src,dst=sys.argv[1:3]
+	opts=dict(arg.split('=',1) for arg in sys.argv[3:])
+	normalisation=opts.pop('normalisation','l2')
+	t=time.time()
+	f=h5py.File(src,'r')
+	names=binary_layers(f)
+	norms=layer_norms(f,normalisation)
+	f.close()
+	keep=opts.pop('keep').split(',') if 'keep' in opts else [names[0],names[-1]]
+	luts=int(opts.pop('luts'))
+	budgets=dict((n,int(v)) for n,v in opts.items())
+	for n in list(budgets)+keep:
+		if n not in norms:
+			raise ValueError('unknown layer '+n)
+	thresholds=solve(norms,luts,budgets,keep)
+	f=open_pruned(src,dst)
+	write_masks(f,OrderedDict((n,np.greater(norms[n],th)) for n,th in thresholds.items()))
+	f.close()
+	total=0
+	for i,n in enumerate(names):
+		count=int(np.sum(norms[n]>thresholds.get(n,-1.)))
+		total+=count if i else 0
+		print('%s: threshold %.6g, %d/%d LUTs%s'%(n,thresholds.get(n,-1.),count,norms[n].size,' (not counted)' if not i else ''))
+	print('%d LUTs for a budget of %d, solved in %.3f s'%(total,luts,time.time()-t))
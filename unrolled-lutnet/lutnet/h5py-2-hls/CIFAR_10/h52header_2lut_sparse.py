@@ -1,6 +1,11 @@
+import os
+import sys
 import h5py
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from codegen import pack_words, hex_words, Outputs
+
 def SignNumpy(x):
   return np.greater(x,0)
 
@@ -514,9 +519,10 @@ if __name__ == "__main__":
                 weights[i][j] = SignNumpy(weights[i][j])
 
     # write header file
-    with open('../src/weights.h', 'w') as f:
+    outputs = Outputs()
+    with outputs.open('../src/weights.h', 'w') as f:
         f.write('#pragma once\n')
-    with open('../src/weights.h', 'a') as f:
+    with outputs.open('../src/weights.h', 'a') as f:
         f.write('//Generated weights for CIFAR-10\n')
 
     for layer_id in range(9):
@@ -545,37 +551,22 @@ if __name__ == "__main__":
             else:
                 print("unknown weight format!")
 
-            with open('../src/weights.h', 'a') as f:
+            with outputs.open('../src/weights.h', 'a') as f:
                 f.write('//Array shape: {}\n'.format(dims))
                 fold = (word_length-1)/32 + 1
                 f.write("const ap_uint<32> " + "weights_" + layer_type + str(layer_id+1) + "_" + str(weight_id+1) + "["+str(nfilters*fold) + "] = {")
-                bin_append = 0
-                for i, ele in enumerate(mat_flat):
-                    #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                    bin_append = bin_append | (int(ele) << (i % word_length)) # right-first bit-push
-                    if (i % word_length == (word_length - 1)):
-                        mask = 0xFFFFFFFF
-                        for i_32b in range(fold):
-                            #word = (bin_append>>(32*(fold-i_32b-1))) & mask # Big-endian: left-first word-push
-                            word = (bin_append>>(32*i_32b)) & mask # Little-endian: right-first word-push
-                            hex_word = '%X' % word
-                            if i_32b!=0:
-                                f.write(', ')
-                            f.write('0x' + hex_word)
-                        bin_append = 0
-                        if i != nfilters*word_length-1:
-                            f.write(', ')
+                f.write(hex_words(pack_words(np.reshape(mat_flat, (-1,word_length)))))
                 f.write('};\n')
 
         if layer_id==5:
             # generate verilog source file for LUTARRAY: Vivado HLS will take forever
-            with open('../src/LUTARRAY_b0_' + str(layer_id) + '.v', 'w') as v0:
+            with outputs.open('../src/LUTARRAY_b0_' + str(layer_id) + '.v', 'w') as v0:
                 v0.write('`timescale 1 ns / 1 ps\n\n')
                 v0.write('module LUTARRAY_b0 (\n        in_V,\n        in_1_V')
                 for tm in range(nfilters):
                     v0.write(',\n        ap_return_' + str(tm))
                 v0.write(');\n\n')
-            with open('../src/LUTARRAY_b1_' + str(layer_id) + '.v', 'w') as v1:
+            with outputs.open('../src/LUTARRAY_b1_' + str(layer_id) + '.v', 'w') as v1:
                 v1.write('`timescale 1 ns / 1 ps\n\n')
                 v1.write('module LUTARRAY_b1 (\n        in_V,\n        in_1_V')
                 for tm in range(nfilters):
@@ -596,7 +587,7 @@ if __name__ == "__main__":
                     print("unknown weight format!")
                 mat_flat.extend([mat])
         
-            with open('../src/LUTARRAY_b0_' + str(layer_id) + '.v', 'a') as v0:
+            with outputs.open('../src/LUTARRAY_b0_' + str(layer_id) + '.v', 'a') as v0:
                 v0.write('\n\n')
                 v0.write('input  [' + str(word_length-1) + ':0] in_V;\n')
                 v0.write('input  [' + str(word_length-1) + ':0] in_1_V;\n')
@@ -625,7 +616,7 @@ if __name__ == "__main__":
                             v0.write('};\n')
                 v0.write('endmodule')
 
-            with open('../src/LUTARRAY_b1_' + str(layer_id) + '.v', 'a') as v1:
+            with outputs.open('../src/LUTARRAY_b1_' + str(layer_id) + '.v', 'a') as v1:
                 v1.write('\n\n')
                 v1.write('input  [' + str(word_length-1) + ':0] in_V;\n')
                 v1.write('input  [' + str(word_length-1) + ':0] in_1_V;\n')
@@ -656,25 +647,10 @@ if __name__ == "__main__":
         # generate pruning mask (first layer only)
         if layer_id==0:
             pruning_mask_flat = pruning_masks[layer_id].transpose(3,0,1,2).flatten()
-            with open('../src/weights.h', 'a') as f:
+            with outputs.open('../src/weights.h', 'a') as f:
                 fold = (word_length-1)/32 + 1
                 f.write("const ap_uint<32> " + "pruning_mask_" + layer_type + str(layer_id+1) + "_" + str(weight_id+1) + "["+str(nfilters*fold) + "] = {")
-                bin_append = 0
-                for i, ele in enumerate(pruning_mask_flat):
-                    #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                    bin_append = bin_append | (int(ele) << (i % word_length)) # right-first bit-push
-                    if (i % word_length == (word_length - 1)):
-                        mask = 0xFFFFFFFF
-                        for i_32b in range(fold):
-                            #word = (bin_append>>(32*(fold-i_32b-1))) & mask # Big-endian: left-first word-push
-                            word = (bin_append>>(32*i_32b)) & mask # Little-endian: right-first word-push
-                            hex_word = '%X' % word
-                            if i_32b!=0:
-                                f.write(', ')
-                            f.write('0x' + hex_word)
-                        bin_append = 0
-                        if i != nfilters*word_length-1:
-                            f.write(', ')
+                f.write(hex_words(pack_words(np.reshape(pruning_mask_flat, (-1,word_length)))))
                 f.write('};\n')
         # generate threshold
         if layer_id!=8: # the last layer does not need threshold
@@ -692,7 +668,7 @@ if __name__ == "__main__":
             thresholds = np.array(makeBNComplex(0, fanin, bn_betas[layer_id], bn_gammas[layer_id], bn_means[layer_id], bn_inv_stds[layer_id], usePopCount=use_popcount))
             next_means_bn_b0 = np.array(makeBNComplex(next_means_b0, fanin, bn_betas[layer_id], bn_gammas[layer_id], bn_means[layer_id], bn_inv_stds[layer_id], usePopCount=use_popcount)) - thresholds
 
-            with open('../src/weights.h', 'a') as f:
+            with outputs.open('../src/weights.h', 'a') as f:
                 f.write("const ap_fixed<24, 16> " + "thresh_" + layer_type + str(layer_id+1) + "["+str(len(thresholds))+"] = {")
                 for i, ele in enumerate(thresholds):
                     if i == 0:
@@ -719,7 +695,7 @@ if __name__ == "__main__":
 
 
         # generate random map
-        with open('../src/weights.h', 'a') as f:
+        with outputs.open('../src/weights.h', 'a') as f:
             rand_map = rand_maps[layer_id].flatten().astype(np.uint32)
             f.write("const unsigned int " + "rand_map_" + layer_type + str(layer_id+1) + "["+str(len(rand_map))+"] = {")
             for i, ele in enumerate(rand_map):
@@ -729,7 +705,7 @@ if __name__ == "__main__":
                     f.write(','+ str(ele))
             f.write('};\n')
         # generate alpha
-        with open('../src/weights.h', 'a') as f:
+        with outputs.open('../src/weights.h', 'a') as f:
             if layer_id!=0:
                 alpha_b0 = abs(gammas[layer_id] * means[layer_id-1][0])
                 alpha_b1 = abs(gammas[layer_id] * means[layer_id-1][1])
@@ -743,6 +719,7 @@ if __name__ == "__main__":
                 f.write("const ap_fixed<24, 16> " + "alpha_" + layer_type + str(layer_id+1) + "[1] = {")
                 f.write(str(alpha_b0))
                 f.write('};\n')
+    outputs.commit()
 
 
 
@@ -1,6 +1,11 @@
+import os
+import sys
 import h5py
 import numpy as np
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),'..'))
+from codegen import pack_words, hex_words, hex_rows, Outputs
+
 def SignNumpy(x):
   return np.greater(x,0)
 
@@ -294,9 +299,10 @@ if __name__ == "__main__":
             weights[i][j] = SignNumpy(weights[i][j])
 
     # write header file
-    with open('../codegen_output/weights.h', 'w') as f:
+    outputs = Outputs()
+    with outputs.open('../codegen_output/weights.h', 'w') as f:
         f.write('#pragma once\n')
-    with open('../codegen_output/weights.h', 'a') as f:
+    with outputs.open('../codegen_output/weights.h', 'a') as f:
         f.write('//Generated weights for MNIST\n')
 
     for layer_id in range(5):
@@ -349,13 +355,13 @@ if __name__ == "__main__":
 
         if layer_id!=0:
             # generate verilog source file for LUTARRAY: Vivado HLS will take forever
-            with open('../codegen_output/XNORARRAY_b0_' + str(layer_id) + '.v', 'w') as v0:
+            with outputs.open('../codegen_output/XNORARRAY_b0_' + str(layer_id) + '.v', 'w') as v0:
                 v0.write('`timescale 1 ns / 1 ps\n\n')
                 v0.write('module XNORARRAY_b0 (\n        in_V')
                 for tm in range(nfilters):
                     v0.write(',\n        ap_return_' + str(tm))
                 v0.write(');\n\n')
-            with open('../codegen_output/XNORARRAY_b1_' + str(layer_id) + '.v', 'w') as v1:
+            with outputs.open('../codegen_output/XNORARRAY_b1_' + str(layer_id) + '.v', 'w') as v1:
                 v1.write('`timescale 1 ns / 1 ps\n\n')
                 v1.write('module XNORARRAY_b1 (\n        in_V')
                 for tm in range(nfilters):
@@ -370,25 +376,11 @@ if __name__ == "__main__":
                     mat_flat = mat.transpose(3,0,1,2).flatten()
                 else:
                     print("unknown weight format!")
-                with open('../codegen_output/XNORARRAY_b0_' + str(layer_id) + '.v', 'a') as v:
-                    bin_append = 0
-                    for i, ele in enumerate(mat_flat):
-                        #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                        bin_append = bin_append | (int(ele) << (i % word_length)) # right-first bit-push
-                        if (i % word_length == (word_length - 1)):
-                            hex_word = '%X' % bin_append
-                            v.write('parameter    ap_const_lv' + str(word_length) + '_' + str(weight_id) + '_' + str(i / word_length) + ' = ' + str(word_length) + "'h" + hex_word + ';\n')
-                            bin_append = 0
-                with open('../codegen_output/XNORARRAY_b1_' + str(layer_id) + '.v', 'a') as v:
-                    bin_append = 0
-                    for i, ele in enumerate(mat_flat):
-                        #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                        bin_append = bin_append | (int(ele) << (i % word_length)) # right-first bit-push
-                        if (i % word_length == (word_length - 1)):
-                            hex_word = '%X' % bin_append
-                            v.write('parameter    ap_const_lv' + str(word_length) + '_' + str(weight_id) + '_' + str(i / word_length) + ' = ' + str(word_length) + "'h" + hex_word + ';\n')
-                            bin_append = 0
-            with open('../codegen_output/XNORARRAY_b0_' + str(layer_id) + '.v', 'a') as v0:
+                with outputs.open('../codegen_output/XNORARRAY_b0_' + str(layer_id) + '.v', 'a') as v:
+                    v.write(''.join(['parameter    ap_const_lv' + str(word_length) + '_' + str(weight_id) + '_' + str(row) + ' = ' + str(word_length) + "'h" + hex_word + ';\n' for row, hex_word in enumerate(hex_rows(np.reshape(mat_flat, (-1,word_length))))]))
+                with outputs.open('../codegen_output/XNORARRAY_b1_' + str(layer_id) + '.v', 'a') as v:
+                    v.write(''.join(['parameter    ap_const_lv' + str(word_length) + '_' + str(weight_id) + '_' + str(row) + ' = ' + str(word_length) + "'h" + hex_word + ';\n' for row, hex_word in enumerate(hex_rows(np.reshape(mat_flat, (-1,word_length))))]))
+            with outputs.open('../codegen_output/XNORARRAY_b0_' + str(layer_id) + '.v', 'a') as v0:
                 v0.write('\n\n')
                 v0.write('input  [' + str(word_length-1) + ':0] in_V;\n')
                 for tm in range(nfilters):
@@ -396,7 +388,7 @@ if __name__ == "__main__":
                 for tm in range(nfilters):
                     v0.write('assign ap_return_' + str(tm) + ' = (ap_const_lv' + str(word_length) + '_0_' + str(tm) + ' & in_V) | (ap_const_lv' + str(word_length) + '_1_'+ str(tm) + ' & ~in_V);\n')
                 v0.write('endmodule')
-            with open('../codegen_output/XNORARRAY_b1_' + str(layer_id) + '.v', 'a') as v1:
+            with outputs.open('../codegen_output/XNORARRAY_b1_' + str(layer_id) + '.v', 'a') as v1:
                 v1.write('\n\n')
                 v1.write('input  [' + str(word_length-1) + ':0] in_V;\n')
                 for tm in range(nfilters):
@@ -409,25 +401,10 @@ if __name__ == "__main__":
         if layer_id==0:
             #pruning_mask_flat = pruning_masks[layer_id].transpose(3,0,1,2).flatten()
             pruning_mask_flat = pruning_masks[layer_id].transpose(1,0).flatten()
-            with open('../codegen_output/weights.h', 'a') as f:
+            with outputs.open('../codegen_output/weights.h', 'a') as f:
                 fold = (word_length-1)/32 + 1
                 f.write("const ap_uint<32> " + "pruning_mask_" + layer_type + str(layer_id+1) + "_" + str(1) + "["+str(nfilters*fold) + "] = {")
-                bin_append = 0
-                for i, ele in enumerate(pruning_mask_flat):
-                    #bin_append = (bin_append << 1) | (int(ele) # left-first bit-push
-                    bin_append = bin_append | (int(ele) << (i % word_length)) # right-first bit-push
-                    if (i % word_length == (word_length - 1)):
-                        mask = 0xFFFFFFFF
-                        for i_32b in range(fold):
-                            #word = (bin_append>>(32*(fold-i_32b-1))) & mask # Big-endian: left-first word-push
-                            word = (bin_append>>(32*i_32b)) & mask # Little-endian: right-first word-push
-                            hex_word = '%X' % word
-                            if i_32b!=0:
-                                f.write(', ')
-                            f.write('0x' + hex_word)
-                        bin_append = 0
-                        if i != nfilters*word_length-1:
-                            f.write(', ')
+                f.write(hex_words(pack_words(np.reshape(pruning_mask_flat, (-1,word_length)))))
                 f.write('};\n')
         # generate threshold
         if layer_id!=4: # the last layer does not need threshold
@@ -445,7 +422,7 @@ if __name__ == "__main__":
             thresholds = np.array(makeBNComplex(0, fanin, bn_betas[layer_id], bn_gammas[layer_id], bn_means[layer_id], bn_inv_stds[layer_id], usePopCount=use_popcount))
             next_means_bn_b0 = np.array(makeBNComplex(next_means_b0, fanin, bn_betas[layer_id], bn_gammas[layer_id], bn_means[layer_id], bn_inv_stds[layer_id], usePopCount=use_popcount)) - thresholds
 
-            with open('../codegen_output/weights.h', 'a') as f:
+            with outputs.open('../codegen_output/weights.h', 'a') as f:
                 f.write("const ap_fixed<24, 16> " + "thresh_" + layer_type + str(layer_id+1) + "["+str(len(thresholds))+"] = {")
                 for i, ele in enumerate(thresholds):
                     if i == 0:
@@ -483,7 +460,7 @@ if __name__ == "__main__":
 #                        f.write(','+ str(ele))
 #                f.write('};\n')
         # generate alpha
-        with open('../codegen_output/weights.h', 'a') as f:
+        with outputs.open('../codegen_output/weights.h', 'a') as f:
             if layer_id!=0:
                 alpha_b0 = abs(gammas[layer_id] * means[layer_id-1][0])
                 alpha_b1 = abs(gammas[layer_id] * means[layer_id-1][1])
@@ -497,6 +474,7 @@ if __name__ == "__main__":
                 f.write("const ap_fixed<24, 16> " + "alpha_" + layer_type + str(layer_id+1) + "[1] = {")
                 f.write(str(alpha_b0))
                 f.write('};\n')
+    outputs.commit()
 
 
 
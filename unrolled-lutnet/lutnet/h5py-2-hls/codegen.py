@@ -0,0 +1,90 @@
+'''Shared helpers of the h52header_* code generators.
+
+Binary parameters are packed a whole array at a time: every row of bits becomes ceil(len/32) ap_uint<32> words,
+bit i of the row at bit i%32 of word i//32 (right-first bit-push, little-endian word order), and the words are formatted
+into C initialisers in bulk.
+
+The generated files are collected in an Outputs buffer and only written, all at once, when generation completes: each
+file goes to a temporary file next to it that is then renamed over it, so an interrupted run leaves the previous
+weights.h and LUTARRAY*.v in place rather than a half-written file for HLS or Vivado to pick up.
+'''
+import os
+from collections import OrderedDict
+import numpy as np
+
+def pack_words(bits):
+	'''[...,fold] uint64 array of the 32-bit words of the rows of the 0/1 array bits [...,L], fold=(L-1)/32+1.'''
+	bits=np.asarray(bits)
+	L=bits.shape[-1]
+	fold=(L-1)//32+1
+	padded=np.zeros(bits.shape[:-1]+(fold*32,),np.uint64)
+	padded[...,:L]=bits.astype(np.int64)
+	return padded.reshape(bits.shape[:-1]+(fold,32)).dot(np.left_shift(np.uint64(1),np.arange(32,dtype=np.uint64)))
+
+def hex_words(words):
+	'''The words of an array as a ', '-separated list of C hex literals, in C order.'''
+	return ', '.join(np.char.mod('0x%X',np.ravel(words)))
+
+def c_list(words):
+	'''Contents of the C brace initialiser of a [...,fold] word array, without its outermost braces.
+	Nested levels are separated by ',' and the words of the innermost level by ', '.
+	'''
+	words=np.asarray(words)
+	if words.ndim<=1:
+		return hex_words(words)
+	return ','.join(['{'+c_list(w)+'}' for w in words])
+
+def hex_rows(bits):
+	'''Every row of the 0/1 array bits [...,L] as one hex number (bit i of the row at bit i), without leading zeros.'''
+	words=pack_words(bits)
+	words=words.reshape(-1,words.shape[-1])[:,::-1] # most significant word first
+	rows=[]
+	for row in words:
+		nz=np.flatnonzero(row)
+		if len(nz)==0:
+			rows.append('0')
+		else:
+			rows.append('%X'%row[nz[0]]+''.join(np.char.mod('%08X',row[nz[0]+1:])))
+	return rows
+
+class Buffer(object):
+	'''In-memory output file: writes are collected as a list of chunks and joined once.'''
+	def __init__(self,text=''):
+		self.chunks=[text] if text else []
+	def write(self,text):
+		self.chunks.append(text)
+	def getvalue(self):
+		return ''.join(self.chunks)
+	def __enter__(self):
+		return self
+	def __exit__(self,*exc):
+		return False
+
+class Outputs(object):
+	'''The output files of a generator script, buffered until commit().
+	open(path,mode) stands in for the builtin open: 'w' starts path afresh, 'a' appends to it, so the scripts can keep
+	reopening their files per layer at no cost.
+	'''
+	def __init__(self):
+		self.files=OrderedDict()
+	def open(self,path,mode='w'):
+		if mode=='w':
+			self.files[path]=Buffer()
+		elif path not in self.files:
+			text=''
+			if os.path.exists(path):
+				with open(path) as f:
+					text=f.read()
+			self.files[path]=Buffer(text)
+		return self.files[path]
+	def commit(self):
+		'''Writes every file to path.tmp and, once all are written, renames them into place.'''
+		for path,buf in self.files.items():
+			d=os.path.dirname(path)
+			if d and not os.path.isdir(d):
+				os.makedirs(d)
+			with open(path+'.tmp','w') as f:
+				f.write(buf.getvalue())
+		for path in self.files:
+			os.rename(path+'.tmp',path)
+		self.files=OrderedDict()
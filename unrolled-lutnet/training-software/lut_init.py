@@ -0,0 +1,61 @@
+'''LUT initialisation of the unrolled LUT layers from a pruned BNN, as done by models/*/scripts/lutnet_init.py.
+
+A LUT layer stores one weight array Variable_k:0 per truth table entry: 16 entries of the 4-input LUTs of each of the two
+residual levels, whose inputs are the BNN input x0 and the inputs picked by rand_map_0/1/2. Entry k is initialised to
+the BNN weight w0 of x0, signed by the value of x0 in the entry, plus for every extra input whose connection was pruned
+from the BNN the weight of that connection, signed by the value of the extra input. All 32 entries are computed as one
+stacked array with one masked gather per extra input.
+
+The entries with x0=1 are exactly what lutnet_init.py has always produced: there all 16 of them referenced the BNN
+weight array itself, so they share one table that receives the updates of every one of them in Variable_k order.
+'''
+import numpy as np
+
+def random_maps(n,count=3):
+	'''count random permutations of range(n), drawn with np.random.shuffle in turn as lutnet_init.py has always drawn them.'''
+	maps=[]
+	for _ in range(count):
+		rand_map=np.arange(n)
+		np.random.shuffle(rand_map)
+		maps.append(rand_map)
+	return maps
+
+def lut_signs(inputs=4,levels=2):
+	'''(levels*2**inputs,inputs) array of +-1: the value of every LUT input in every truth table entry, in Variable_k order.
+	Entry 0 has all inputs 1, and the last input changes fastest, as in binary_conv and binary_dense.
+	'''
+	k=np.arange(2**inputs)
+	bits=(k[:,None]>>np.arange(inputs-1,-1,-1)[None,:])&1
+	return np.tile(1-2*bits,[levels,1])
+
+def lut_weights(w,pruning_mask,rand_maps,levels=2):
+	'''Initial truth tables, stacked to (levels*2**(len(rand_maps)+1),)+w.shape, of a LUT layer with BNN weights w.
+	pruning_mask is the [window_size,nfilters] mask of the BNN; a connection recovered into a LUT by one rand_map is no
+	longer pruned for the following ones.
+	'''
+	w=np.array(w)
+	shape=w.shape
+	w_unroll=w.reshape(-1,shape[-1])
+	pruning_mask=np.array(pruning_mask).astype(bool)
+	signs=lut_signs(len(rand_maps)+1,levels).astype(w.dtype).reshape((-1,len(rand_maps)+1)+(1,)*len(shape))
+	shared=signs[:,0].ravel()>0
+	tables=signs[:,0]*w
+	w_shared=w.copy()
+	for i,rand_map in enumerate(rand_maps):
+		init_mask=np.logical_not(pruning_mask[rand_map])
+		pruning_mask=np.logical_or(pruning_mask,np.logical_and(pruning_mask,init_mask)[np.argsort(rand_map)])
+		w_rand=np.where(init_mask,w_unroll[rand_map],0).reshape(shape)
+		tables[~shared]+=signs[~shared,i+1]*w_rand
+		for sign in signs[shared,i+1].ravel(): # one update at a time, to round exactly as the shared array always has
+			w_shared+=sign*w_rand
+	tables[shared]=w_shared
+	return tables
+
+def write_lut_weights(g,tables):
+	'''Writes stacked truth tables into Variable_1:0, Variable_2:0, ... of the weights group g of a layer.
+	Each table is a contiguous block of the stack and goes to its dataset in a single write.
+	'''
+	tables=np.ascontiguousarray(tables)
+	for k in range(tables.shape[0]):
+		ds=g['Variable_%d:0'%(k+1)]
+		ds.write_direct(tables[k].astype(ds.dtype,copy=False))